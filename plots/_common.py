@@ -0,0 +1,123 @@
+"""
+Helpers shared by the plot scripts: input discovery and parsing, redraw
+skipping, and deferred matplotlib setup.
+"""
+
+import functools
+import json
+import os
+
+try:
+    import orjson
+except ImportError:  # optional; fall back to the stdlib parser
+    orjson = None
+
+STYLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'p2s.mplstyle')
+
+# Above this size, a keyed load streams the file with ijson (when installed)
+STREAM_THRESHOLD = 512 * 1024 * 1024
+
+def find_latest(data_dir, prefix, suffix='.json', by='st_mtime'):
+    """Return the newest data_dir/prefix*suffix file, using one scandir pass.
+
+    by names the stat field that decides "newest" (st_mtime or st_ctime).
+    """
+    best, best_time = None, -1.0
+    try:
+        with os.scandir(data_dir) as it:
+            for entry in it:
+                name = entry.name
+                if name.startswith(prefix) and name.endswith(suffix):
+                    t = getattr(entry.stat(), by)
+                    if t > best_time:
+                        best, best_time = entry.path, t
+    except FileNotFoundError:
+        return None
+    return best
+
+def read_json(path, keys=None):
+    """Parse a JSON file, using orjson when it is installed.
+
+    With keys, only those top-level entries are kept, and files over
+    STREAM_THRESHOLD are streamed so the whole document is never in memory.
+    """
+    if keys is not None and os.path.getsize(path) > STREAM_THRESHOLD:
+        try:
+            import ijson
+        except ImportError:  # optional; fall back to a bulk parse
+            pass
+        else:
+            with open(path, 'rb') as f:
+                return {k: v for k, v in ijson.kvitems(f, '', use_float=True) if k in keys}
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            data = orjson.loads(f.read())
+    else:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    if keys is not None:
+        data = {k: data[k] for k in keys if k in data}
+    return data
+
+@functools.lru_cache(maxsize=8)
+def _load_json_cached(path, mtime_ns, size):
+    """Parse a JSON file once per (path, mtime, size); later calls are a dict lookup."""
+    return read_json(path)
+
+def load_json(path):
+    """Load JSON via the stat-keyed cache so an edited file is re-parsed."""
+    st = os.stat(path)
+    return _load_json_cached(path, st.st_mtime_ns, st.st_size)
+
+def is_up_to_date(out_path, input_mtime, script, variant=None):
+    """True if out_path is newer than the input data, the plotting script and this module.
+
+    With variant (e.g. the palette colors), out_path must also have been drawn
+    with that same variant, as recorded by record_variant.
+    Set P2S_FORCE_REPLOT=1 to always redraw.
+    """
+    if input_mtime is None or os.environ.get('P2S_FORCE_REPLOT'):
+        return False
+    try:
+        code_mtime = max(os.path.getmtime(script), os.path.getmtime(__file__))
+        fresh = os.path.getmtime(out_path) >= max(input_mtime, code_mtime)
+        if fresh and variant is not None:
+            with open(out_path + '.variant', 'r') as f:
+                fresh = f.read() == variant
+    except OSError:
+        return False
+    if fresh:
+        print(f"Up to date, skipping {out_path}")
+    return fresh
+
+def record_variant(out_path, variant):
+    """Remember which variant out_path was drawn with, for is_up_to_date."""
+    with open(out_path + '.variant', 'w') as f:
+        f.write(variant)
+
+@functools.lru_cache(maxsize=None)
+def pyplot(font_size=None, seaborn_theme=False):
+    """Import and configure matplotlib on first use, applying p2s.mplstyle.
+
+    Deferred so a run without input data exits before paying for the import.
+    font_size overrides the style sheet's font.size; seaborn_theme applies
+    seaborn's "ticks" theme underneath the style sheet.
+    """
+    import matplotlib
+    matplotlib.use('Agg')  # headless: scripts only write files
+    import matplotlib.pyplot as plt
+
+    if seaborn_theme:
+        import seaborn as sns
+        sns.set_theme(style="ticks")
+    styles = [STYLE_PATH]
+    if font_size is not None:
+        styles.append({'font.size': font_size})
+    plt.style.use(styles)
+    return plt
+
+def plotting_modules(font_size=None):
+    """(plt, sns), configured as pyplot(font_size, seaborn_theme=True)."""
+    plt = pyplot(font_size, seaborn_theme=True)
+    import seaborn as sns
+    return plt, sns
@@ -4,51 +4,63 @@ MEV comparison plots (Ethereum vs P2S).
 Uses a single cached comparison dataset in data/ — no testnet rerun required.
 """
 
-import glob
-import json
+import argparse
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
-import matplotlib.pyplot as plt
-import numpy as np
-import seaborn as sns
+from _common import find_latest, is_up_to_date, load_json, plotting_modules, record_variant
 
 DATA_DIR = "data"
 FIGURES_DIR = "figures"
 
-# Colors from seaborn vlag palette (diverging blue to red)
-VLAG_PALETTE = sns.color_palette("vlag", n_colors=10)
-COLOR_BLUE = VLAG_PALETTE[1]   # Ethereum (blue end)
-COLOR_RED = VLAG_PALETTE[-2]   # P2S (red end)
+# Colors from seaborn vlag palette (diverging blue to red), n_colors=10
+COLOR_BLUE = "#7e9ac2"   # Ethereum (blue end, index 1)
+COLOR_RED = "#c87e7b"    # P2S (red end, index -2)
 
-# Default paths: use one comparison file (generated once from inspect + compare)
-def _find_latest(path_pattern: str):
-    files = glob.glob(path_pattern)
-    if not files:
-        return None
-    return max(files, key=os.path.getmtime)
+# (Ethereum, P2S) colors per named palette
+PALETTES = {
+    "vlag": (COLOR_BLUE, COLOR_RED),
+    "pastel": ("#9ECAE1", "#A1D99B"),
+}
 
 
 def load_comparison(data_dir: str = DATA_DIR):
-    """Load MEV comparison JSON from data/. Prefers mev_comparison.json, else latest mev_comparison_*.json."""
+    """Load MEV comparison JSON from data/. Prefers mev_comparison.json, else latest mev_comparison_*.json.
+
+    Returns (data, input_mtime), or (None, None) when no file is found.
+    """
     canonical = os.path.join(data_dir, "mev_comparison.json")
-    if os.path.isfile(canonical):
-        with open(canonical, "r") as f:
-            return json.load(f)
-    path = _find_latest(os.path.join(data_dir, "mev_comparison_*.json"))
-    if path:
-        with open(path, "r") as f:
-            return json.load(f)
-    return None
+    path = canonical if os.path.isfile(canonical) else find_latest(data_dir, "mev_comparison_")
+    if not path:
+        return None, None
+    return load_json(path), os.path.getmtime(path)
+
+
+def _grouped_bars(ax, labels, eth_vals, p2s_vals, colors, w: float = 0.35) -> None:
+    """Draw Ethereum/P2S bars side by side from one stacked (2, N) array."""
+    import numpy as np
+
+    vals = np.vstack([eth_vals, p2s_vals]).astype(np.float64)
+    x = np.arange(vals.shape[1])
+    offsets = np.array([-w / 2, w / 2])
+    for row, off, color, label in zip(vals, offsets, colors, ("Ethereum", "P2S")):
+        ax.bar(x + off, row, w, label=label, color=color, edgecolor="white", linewidth=1.2)
+    ax.set_xticks(x)
+    ax.set_xticklabels(labels, rotation=25, ha="right", fontsize=20)
 
 
-def plot_mev_totals(comparison_data: dict, out_path: str) -> None:
+def plot_mev_totals(comparison_data: dict, out_path: str, input_mtime: float = None,
+                    colors=PALETTES["vlag"]) -> None:
     """Bar chart: Total MEV by type (Eth vs P2S)."""
+    variant = ",".join(colors)
+    if is_up_to_date(out_path, input_mtime, __file__, variant):
+        return
+    plt, sns = plotting_modules()
     mev_by_type = comparison_data.get("mev_by_type", {})
     if not mev_by_type:
         return
 
-    sns.set_theme(style="ticks")
     types = []
     eth_totals = []
     p2s_totals = []
@@ -58,30 +70,29 @@ def plot_mev_totals(comparison_data: dict, out_path: str) -> None:
         p2s_totals.append(stats["p2s"]["total"])
 
     fig, ax = plt.subplots(figsize=(10, 7))
-    x = np.arange(len(types))
-    w = 0.35
-    ax.bar(x - w / 2, eth_totals, w, label="Ethereum", color=COLOR_BLUE, edgecolor="white", linewidth=1.2)
-    ax.bar(x + w / 2, p2s_totals, w, label="P2S", color=COLOR_RED, edgecolor="white", linewidth=1.2)
+    _grouped_bars(ax, types, eth_totals, p2s_totals, colors)
     ax.set_ylabel("Total MEV (ETH)", fontsize=24, fontweight='bold')
-    ax.set_xticks(x)
-    ax.set_xticklabels(types, rotation=25, ha="right", fontsize=20)
     ax.tick_params(axis='y', labelsize=18)
     ax.legend(fontsize=20)
     sns.despine(ax=ax)
     plt.tight_layout()
-    os.makedirs(FIGURES_DIR, exist_ok=True)
-    plt.savefig(out_path, dpi=300, bbox_inches="tight")
-    plt.close()
+    plt.savefig(out_path, dpi=300)
+    plt.close(fig)
+    record_variant(out_path, variant)
     print(f"Saved {out_path}")
 
 
-def plot_mev_reduction(comparison_data: dict, out_path: str) -> None:
+def plot_mev_reduction(comparison_data: dict, out_path: str, input_mtime: float = None,
+                       colors=PALETTES["vlag"]) -> None:
     """Horizontal bar chart: P2S MEV reduction % vs Ethereum by type."""
+    variant = ",".join(colors)
+    if is_up_to_date(out_path, input_mtime, __file__, variant):
+        return
+    plt, sns = plotting_modules()
     mev_by_type = comparison_data.get("mev_by_type", {})
     if not mev_by_type:
         return
 
-    sns.set_theme(style="ticks")
     types = []
     reductions = []
     for mev_type, stats in mev_by_type.items():
@@ -89,22 +100,27 @@ def plot_mev_reduction(comparison_data: dict, out_path: str) -> None:
         reductions.append(stats["reduction"]["total_pct"])
 
     fig, ax = plt.subplots(figsize=(10, 7))
-    colors = [COLOR_RED if r > 0 else COLOR_BLUE for r in reductions]
-    ax.barh(types, reductions, color=colors, edgecolor="white", linewidth=1.2)
+    eth_color, p2s_color = colors
+    bar_colors = [p2s_color if r > 0 else eth_color for r in reductions]
+    ax.barh(types, reductions, color=bar_colors, edgecolor="white", linewidth=1.2)
     ax.set_xlabel("Reduction (%)", fontsize=24, fontweight='bold')
     ax.axvline(0, color="gray", linewidth=0.8, linestyle="--")
     ax.tick_params(axis='both', labelsize=20)
     sns.despine(ax=ax)
     plt.tight_layout()
-    os.makedirs(FIGURES_DIR, exist_ok=True)
-    plt.savefig(out_path, dpi=300, bbox_inches="tight")
-    plt.close()
+    plt.savefig(out_path, dpi=300)
+    plt.close(fig)
+    record_variant(out_path, variant)
     print(f"Saved {out_path}")
 
 
-def plot_activities_count(comparison_data: dict, out_path: str) -> None:
+def plot_activities_count(comparison_data: dict, out_path: str, input_mtime: float = None,
+                          colors=PALETTES["vlag"]) -> None:
     """Bar chart: activity counts (miner payments, swaps, arbitrages, sandwich) Eth vs P2S."""
-    sns.set_theme(style="ticks")
+    variant = ",".join(colors)
+    if is_up_to_date(out_path, input_mtime, __file__, variant):
+        return
+    plt, sns = plotting_modules()
     comp = comparison_data.get("comparison", {})
     eth = comp.get("ethereum", {})
     p2s = comp.get("p2s", {})
@@ -115,39 +131,48 @@ def plot_activities_count(comparison_data: dict, out_path: str) -> None:
     p2s_vals = [p2s.get(k, 0) for k in keys]
 
     fig, ax = plt.subplots(figsize=(10, 7))
-    x = np.arange(len(labels))
-    w = 0.35
-    ax.bar(x - w / 2, eth_vals, w, label="Ethereum", color=COLOR_BLUE, edgecolor="white", linewidth=1.2)
-    ax.bar(x + w / 2, p2s_vals, w, label="P2S", color=COLOR_RED, edgecolor="white", linewidth=1.2)
+    _grouped_bars(ax, labels, eth_vals, p2s_vals, colors)
     ax.set_ylabel("Count", fontsize=24, fontweight='bold')
-    ax.set_xticks(x)
-    ax.set_xticklabels(labels, rotation=25, ha="right", fontsize=20)
     ax.tick_params(axis='y', labelsize=18)
     ax.legend(fontsize=20)
     sns.despine(ax=ax)
     plt.tight_layout()
-    os.makedirs(FIGURES_DIR, exist_ok=True)
-    plt.savefig(out_path, dpi=300, bbox_inches="tight")
-    plt.close()
+    plt.savefig(out_path, dpi=300)
+    plt.close(fig)
+    record_variant(out_path, variant)
     print(f"Saved {out_path}")
 
 
-def main():
+def main(palette: str = "vlag"):
     # Resolve paths from repo root (parent of plots/)
     repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
     data_dir = os.path.join(repo_root, DATA_DIR)
     figures_dir = os.path.join(repo_root, FIGURES_DIR)
+    os.makedirs(figures_dir, exist_ok=True)
 
-    data = load_comparison(data_dir)
+    data, input_mtime = load_comparison(data_dir)
     if not data:
         print("No MEV comparison data found. Put data/mev_comparison.json (or mev_comparison_*.json) in project root.", file=sys.stderr)
         sys.exit(1)
 
-    plot_mev_totals(data, os.path.join(figures_dir, "mev_totals_by_type.pdf"))
-    plot_mev_reduction(data, os.path.join(figures_dir, "mev_by_type.pdf"))
-    plot_activities_count(data, os.path.join(figures_dir, "mev_activities_count.pdf"))
+    # The three figures are independent; render and encode them on separate cores
+    jobs = [
+        (plot_mev_totals, "mev_totals_by_type.pdf"),
+        (plot_mev_reduction, "mev_by_type.pdf"),
+        (plot_activities_count, "mev_activities_count.pdf"),
+    ]
+    with ProcessPoolExecutor(max_workers=len(jobs)) as ex:
+        futures = [
+            ex.submit(fn, data, os.path.join(figures_dir, name), input_mtime, PALETTES[palette])
+            for fn, name in jobs
+        ]
+        for fut in futures:
+            fut.result()
     print("Done. Figures in", figures_dir)
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="MEV comparison plots (Ethereum vs P2S)")
+    parser.add_argument("--palette", choices=sorted(PALETTES), default="vlag",
+                        help="Colors for the Ethereum/P2S series")
+    main(parser.parse_args().palette)
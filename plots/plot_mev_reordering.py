@@ -4,14 +4,11 @@ MEV reordering: mean MEV opportunity per block (P2S vs Ethereum PoS).
 Uses a single cached dataset in data/ — no simulation rerun required.
 """
 
-import glob
-import json
 import os
 import sys
+import zipfile
 
-import matplotlib.pyplot as plt
-import numpy as np
-import seaborn as sns
+from _common import find_latest, is_up_to_date, plotting_modules, read_json
 
 DATA_DIR = "data"
 FIGURES_DIR = "figures"
@@ -20,37 +17,82 @@ FIGURES_DIR = "figures"
 PASTEL_P2S = "#A1D99B"
 PASTEL_ETH = "#9ECAE1"
 
+# Colors from seaborn vlag palette (diverging blue to red), n_colors=10
+VLAG_BLUE = "#7e9ac2"  # index 1
+VLAG_RED = "#c87e7b"   # index -2
 
-def load_reordering_data(data_dir: str):
-    """Load one dataset: data/mev_reordering.json or latest data/simulation_*.json."""
+PROTOCOLS = ["p2s", "ethereum_pos"]
+
+
+def _reordering_source(data_dir: str):
+    """Path of data/mev_reordering.json, else the latest data/simulation_*.json (or None)."""
     single = os.path.join(data_dir, "mev_reordering.json")
-    if os.path.isfile(single):
-        with open(single, "r") as f:
-            return json.load(f)
-    files = glob.glob(os.path.join(data_dir, "simulation_*.json"))
-    if not files:
-        return None
-    path = max(files, key=os.path.getmtime)
-    with open(path, "r") as f:
-        return json.load(f)
-
-
-def plot_mev_reordering(data: dict, out_path: str) -> None:
-    """Single bar chart: mean MEV opportunity per block."""
-    sns.set_theme(style="ticks")
-    reorder = data.get("mev_reordering", {})
-    protocols = ["p2s", "ethereum_pos"]
+    return single if os.path.isfile(single) else find_latest(data_dir, "simulation_")
+
+
+def load_opportunities(data_dir: str):
+    """Load per-protocol MEV opportunities as float64 arrays.
+
+    The arrays are cached in a .npz next to the source JSON and reused while it is
+    at least as new as the JSON, so warm runs skip JSON parsing entirely. An
+    unreadable cache is treated as a miss and rewritten.
+    Returns ({protocol: ndarray}, input_mtime), or (None, None) when no file is found.
+    """
+    path = _reordering_source(data_dir)
+    if not path:
+        return None, None
+    import numpy as np
+
+    input_mtime = os.path.getmtime(path)
+    cache_path = os.path.splitext(path)[0] + ".opportunities.npz"
+
+    if os.path.isfile(cache_path) and os.path.getmtime(cache_path) >= input_mtime:
+        try:
+            with np.load(cache_path) as cached:
+                return {p: cached[p] for p in cached.files}, input_mtime
+        except (OSError, ValueError, zipfile.BadZipFile):
+            pass  # corrupt or truncated cache: rebuild it from the JSON
+
+    reorder = read_json(path).get("mev_reordering", {})
+    opportunities = {
+        p: np.asarray(reorder.get(p, {}).get("opportunities", []), dtype=np.float64) for p in PROTOCOLS
+    }
+    # Write to a temp file in the same directory and rename it into place, so an
+    # interrupted run never leaves a partial cache behind
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **opportunities)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # read-only data dir: just skip the cache
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    return opportunities, input_mtime
+
+
+def plot_mev_reordering(opportunities: dict, out_path: str, input_mtime: float = None) -> None:
+    """Single bar chart: mean MEV opportunity per block.
+
+    opportunities maps protocol key ("p2s", "ethereum_pos") to per-block values.
+    """
+    if is_up_to_date(out_path, input_mtime, __file__):
+        return
+    import numpy as np
+
+    plt, sns = plotting_modules()
     labels = ["P2S", "Ethereum PoS"]
-    # Use vlag palette colors
-    vlag = sns.color_palette("vlag", n_colors=10)
-    colors = [vlag[-2], vlag[1]]  # P2S red, Ethereum blue
+    colors = [VLAG_RED, VLAG_BLUE]  # P2S red, Ethereum blue
 
     means = []
     stds = []
-    for p in protocols:
-        opps = reorder.get(p, {}).get("opportunities", [])
-        means.append(float(np.mean(opps)) if opps else 0)
-        stds.append(float(np.std(opps)) if len(opps) > 1 else 0)
+    for p in PROTOCOLS:
+        # Opportunity lists can differ in length, so convert each once and reuse it
+        opps = np.asarray(opportunities.get(p, []), dtype=np.float64)
+        means.append(float(opps.mean()) if opps.size else 0)
+        stds.append(float(opps.std()) if opps.size > 1 else 0)
 
     fig, ax = plt.subplots(figsize=(10, 7))
     ax.bar(labels, means, color=colors, yerr=stds, capsize=10, edgecolor="white", linewidth=1.2)
@@ -59,9 +101,8 @@ def plot_mev_reordering(data: dict, out_path: str) -> None:
     ax.set_ylim(0, max(means) * 1.2 if means else 1)
     sns.despine(ax=ax)
     plt.tight_layout()
-    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
-    plt.savefig(out_path, dpi=300, bbox_inches="tight")
-    plt.close()
+    plt.savefig(out_path, dpi=300)
+    plt.close(fig)
     print(f"Saved {out_path}")
 
 
@@ -69,13 +110,14 @@ def main():
     repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
     data_dir = os.path.join(repo_root, DATA_DIR)
     figures_dir = os.path.join(repo_root, FIGURES_DIR)
+    os.makedirs(figures_dir, exist_ok=True)
 
-    data = load_reordering_data(data_dir)
-    if not data:
+    opportunities, input_mtime = load_opportunities(data_dir)
+    if opportunities is None:
         print("No data. Add data/mev_reordering.json or data/simulation_*.json", file=sys.stderr)
         sys.exit(1)
 
-    plot_mev_reordering(data, os.path.join(figures_dir, "mev_reordering.pdf"))
+    plot_mev_reordering(opportunities, os.path.join(figures_dir, "mev_reordering.pdf"), input_mtime)
     print("Done. Figures in", figures_dir)
 
 
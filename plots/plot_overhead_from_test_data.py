@@ -3,36 +3,56 @@
 Plot overhead metrics from simulation data (simulation_*.json)
 """
 
-import json
+import functools
 import os
-import glob
-import matplotlib.pyplot as plt
-import seaborn as sns
-import numpy as np
-import statistics
 
-# Set style with coherent colors (matching MEV plots)
-sns.set_theme(style="ticks")
-# Colors from seaborn vlag palette (diverging blue to red)
-VLAG_PALETTE = sns.color_palette("vlag", n_colors=10)
-ETH_COLOR = VLAG_PALETTE[1]   # Ethereum (blue end)
-P2S_COLOR = VLAG_PALETTE[-2]  # P2S (red end)
+from _common import find_latest, is_up_to_date, plotting_modules, read_json
 
-plt.rcParams['figure.dpi'] = 300
-plt.rcParams['savefig.dpi'] = 300
-plt.rcParams['font.size'] = 18
+# Coherent colors (matching MEV plots) from seaborn vlag palette (diverging blue to red), n_colors=10
+ETH_COLOR = '#7e9ac2'  # Ethereum (blue end, index 1)
+P2S_COLOR = '#c87e7b'  # P2S (red end, index -2)
 
 def load_latest_simulation_data(data_dir="data"):
-    """Load the latest simulation data"""
-    files = glob.glob(f"{data_dir}/simulation_*.json")
-    if not files:
-        return None
-    latest_file = max(files, key=os.path.getctime)
-    with open(latest_file, 'r') as f:
-        return json.load(f)
+    """Load the latest simulation data
 
-def plot_block_time_distribution(data):
+    Returns (data, input_mtime), or (None, None) when no file is found.
+    """
+    latest_file = find_latest(data_dir, 'simulation_', by='st_ctime')
+    if not latest_file:
+        return None, None
+    return read_json(latest_file), os.path.getmtime(latest_file)
+
+def _overhead_means_loop(total, net):
+    """Mean processing time (total - latency) and mean latency in one fused pass."""
+    proc_sum = 0.0
+    net_sum = 0.0
+    for i in range(total.shape[0]):
+        proc_sum += total[i] - net[i]
+        net_sum += net[i]
+    n = total.shape[0]
+    return proc_sum / n, net_sum / n
+
+def _overhead_means_numpy(total, net):
+    """NumPy equivalent of _overhead_means_loop."""
+    return (total - net).mean(), net.mean()
+
+@functools.lru_cache(maxsize=None)
+def _overhead_means_kernel():
+    """Return the fused loop JIT-compiled by numba, or the NumPy version without numba."""
+    try:
+        from numba import njit
+    except ImportError:  # optional dependency
+        return _overhead_means_numpy
+    return njit(cache=True, fastmath=True)(_overhead_means_loop)
+
+def plot_block_time_distribution(data, input_mtime=None):
     """Plot only block time distribution (no average comparison)"""
+    if is_up_to_date('figures/overhead_block_time.pdf', input_mtime, __file__):
+        return
+    import numpy as np
+
+    plt, sns = plotting_modules(font_size=18)
+    
     # Extract block data from simulation.py format
     p2s_blocks = data.get('p2s_data', [])
     pos_blocks = data.get('ethereum_pos_data', [])
@@ -44,38 +64,36 @@ def plot_block_time_distribution(data):
     # Calculate total block processing overhead (processing + network latency)
     # Note: This measures overhead WITHIN a 12-second slot, not the slot time itself
     # Ethereum PoS has fixed 12-second slots, but blocks take time to process and propagate
-    # processing_time = total_time - network_latency
-    p2s_blk_total_time = []
-    pos_blk_total_time = []
-    
-    for block in p2s_blocks:
-        total_time = block.get('total_time', 0)
-        network_latency = block.get('network_latency', 0)
-        processing_time = total_time - network_latency
-        p2s_blk_total_time.append(processing_time + network_latency)
-    
-    for block in pos_blocks:
-        total_time = block.get('total_time', 0)
-        network_latency = block.get('network_latency', 0)
-        processing_time = total_time - network_latency
-        pos_blk_total_time.append(processing_time + network_latency)
+    # processing_time = total_time - network_latency, so processing + latency == total_time
+    p2s_blk_total_time = np.fromiter((b.get('total_time', 0) for b in p2s_blocks),
+                                     dtype=np.float64, count=len(p2s_blocks))
+    p2s_net = np.fromiter((b.get('network_latency', 0) for b in p2s_blocks),
+                          dtype=np.float64, count=len(p2s_blocks))
+    pos_blk_total_time = np.fromiter((b.get('total_time', 0) for b in pos_blocks),
+                                     dtype=np.float64, count=len(pos_blocks))
+    pos_net = np.fromiter((b.get('network_latency', 0) for b in pos_blocks),
+                          dtype=np.float64, count=len(pos_blocks))
     
     # Calculate means
-    p2s_proc_mean = statistics.mean([b.get('total_time', 0) - b.get('network_latency', 0) for b in p2s_blocks])
-    p2s_net_mean = statistics.mean([b.get('network_latency', 0) for b in p2s_blocks])
-    pos_proc_mean = statistics.mean([b.get('total_time', 0) - b.get('network_latency', 0) for b in pos_blocks])
-    pos_net_mean = statistics.mean([b.get('network_latency', 0) for b in pos_blocks])
+    overhead_means = _overhead_means_kernel()
+    p2s_proc_mean, p2s_net_mean = overhead_means(p2s_blk_total_time, p2s_net)
+    pos_proc_mean, pos_net_mean = overhead_means(pos_blk_total_time, pos_net)
     
     p2s_total_mean = p2s_proc_mean + p2s_net_mean
     pos_total_mean = pos_proc_mean + pos_net_mean
     
     fig, ax = plt.subplots(figsize=(10, 7))
     
-    # Block processing overhead distribution histogram
-    ax.hist(pos_blk_total_time, bins=40, alpha=0.6, label='Ethereum', 
-            color=ETH_COLOR, edgecolor='white', linewidth=1.2)
-    ax.hist(p2s_blk_total_time, bins=40, alpha=0.6, label='P2S', 
-            color=P2S_COLOR, edgecolor='white', linewidth=1.2)
+    # Block processing overhead distribution histogram (shared bin edges for both series)
+    # 80 bars stay vector: rasterizing them made the PDF larger and no faster to write
+    edges = np.histogram_bin_edges(np.concatenate([pos_blk_total_time, p2s_blk_total_time]), bins=40)
+    widths = np.diff(edges)
+    pos_counts, _ = np.histogram(pos_blk_total_time, edges)
+    p2s_counts, _ = np.histogram(p2s_blk_total_time, edges)
+    ax.bar(edges[:-1], pos_counts, width=widths, align='edge', alpha=0.6, label='Ethereum', 
+           color=ETH_COLOR, edgecolor='white', linewidth=1.2)
+    ax.bar(edges[:-1], p2s_counts, width=widths, align='edge', alpha=0.6, label='P2S', 
+           color=P2S_COLOR, edgecolor='white', linewidth=1.2)
     
     # Add mean lines
     ax.axvline(pos_total_mean, color=ETH_COLOR, linestyle='--', linewidth=2, 
@@ -91,13 +109,14 @@ def plot_block_time_distribution(data):
     sns.despine(ax=ax)
     
     plt.tight_layout()
-    os.makedirs('figures', exist_ok=True)
-    plt.savefig('figures/overhead_block_time.pdf', dpi=300, bbox_inches='tight')
-    plt.close()
+    plt.savefig('figures/overhead_block_time.pdf', dpi=300)
+    plt.close(fig)
     print("  ✓ Saved: figures/overhead_block_time.pdf")
 
 def print_overhead_ratios(data):
     """Print overhead ratios instead of plotting"""
+    import numpy as np
+
     # Calculate overhead ratios from simulation data
     p2s_blocks = data.get('p2s_data', [])
     pos_blocks = data.get('ethereum_pos_data', [])
@@ -107,15 +126,15 @@ def print_overhead_ratios(data):
         return
     
     # Calculate means
-    p2s_times = [b.get('total_time', 0) for b in p2s_blocks]
-    pos_times = [b.get('total_time', 0) for b in pos_blocks]
-    p2s_gas = [b.get('gas_cost', 0) for b in p2s_blocks]
-    pos_gas = [b.get('gas_cost', 0) for b in pos_blocks]
+    p2s_times = np.fromiter((b.get('total_time', 0) for b in p2s_blocks), dtype=np.float64, count=len(p2s_blocks))
+    pos_times = np.fromiter((b.get('total_time', 0) for b in pos_blocks), dtype=np.float64, count=len(pos_blocks))
+    p2s_gas = np.fromiter((b.get('gas_cost', 0) for b in p2s_blocks), dtype=np.float64, count=len(p2s_blocks))
+    pos_gas = np.fromiter((b.get('gas_cost', 0) for b in pos_blocks), dtype=np.float64, count=len(pos_blocks))
     
-    p2s_mean_time = statistics.mean(p2s_times) if p2s_times else 0
-    pos_mean_time = statistics.mean(pos_times) if pos_times else 0
-    p2s_mean_gas = statistics.mean(p2s_gas) if p2s_gas else 0
-    pos_mean_gas = statistics.mean(pos_gas) if pos_gas else 0
+    p2s_mean_time = float(p2s_times.mean()) if p2s_times.size else 0
+    pos_mean_time = float(pos_times.mean()) if pos_times.size else 0
+    p2s_mean_gas = float(p2s_gas.mean()) if p2s_gas.size else 0
+    pos_mean_gas = float(pos_gas.mean()) if pos_gas.size else 0
     
     time_overhead = ((p2s_mean_time - pos_mean_time) / pos_mean_time * 100) if pos_mean_time > 0 else 0
     gas_overhead = ((p2s_mean_gas - pos_mean_gas) / pos_mean_gas * 100) if pos_mean_gas > 0 else 0
@@ -130,14 +149,15 @@ def print_overhead_ratios(data):
 
 def main():
     """Main function"""
-    data = load_latest_simulation_data()
+    data, input_mtime = load_latest_simulation_data()
     if not data:
         print("⚠ No simulation data found")
         print("   Run: python scripts/testing/simulation.py")
         return
     
     print("Creating overhead plots from simulation data...")
-    plot_block_time_distribution(data)
+    os.makedirs('figures', exist_ok=True)
+    plot_block_time_distribution(data, input_mtime)
     print_overhead_ratios(data)
     
     print("\n✅ Overhead plots created successfully!")
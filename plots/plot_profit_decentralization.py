@@ -4,33 +4,45 @@ Research Question 1: Profit Decentralization
 Lorenz Curve comparing profit distribution between P2S and Ethereum PoS
 """
 
-import json
 import os
-import numpy as np
-import matplotlib.pyplot as plt
 from typing import Dict
-import glob
 
-plt.rcParams['figure.dpi'] = 300
-plt.rcParams['savefig.dpi'] = 300
-plt.rcParams['font.size'] = 20
-plt.rcParams['font.family'] = 'sans-serif'
+from _common import find_latest, is_up_to_date, pyplot, read_json
 
-def load_latest_research_data(data_dir="data"):
-    """Load the latest research metrics data"""
-    files = glob.glob(f"{data_dir}/simulation_*.json")
-    if not files:
-        return None
-    latest_file = max(files, key=os.path.getctime)
-    with open(latest_file, 'r') as f:
-        return json.load(f)
+# Lorenz curves are drawn from at most this many points
+MAX_CURVE_POINTS = 1000
 
-def plot_profit_decentralization(data: Dict):
-    """Lorenz Curve: Clean visualization for profit distribution"""
+def load_latest_research_data(data_dir="data", keys=None):
+    """Load the latest research metrics data, optionally only the given top-level keys
+
+    Returns (data, input_mtime), or (None, None) when no file is found.
+    """
+    latest_file = find_latest(data_dir, 'simulation_', by='st_ctime')
+    if not latest_file:
+        return None, None
+    return read_json(latest_file, keys), os.path.getmtime(latest_file)
+
+def plot_profit_decentralization(data: Dict, input_mtime=None, ax=None,
+                                 out_path='figures/profit_decentralization.pdf'):
+    """Lorenz Curve: Clean visualization for profit distribution
+
+    Pass ax to draw on an existing axes (it is cleared first) instead of a new figure.
+    """
+    if is_up_to_date(out_path, input_mtime, __file__):
+        return
+    import numpy as np
+
+    plt = pyplot(font_size=20)
+    
     P2S_COLOR = '#2ecc71'
     ETH_COLOR = '#3498db'
     
-    fig, ax = plt.subplots(figsize=(10, 10))
+    owns_fig = ax is None
+    if owns_fig:
+        fig, ax = plt.subplots(figsize=(10, 10))
+    else:
+        ax.clear()
+        fig = ax.figure
     
     # Perfect equality line
     ax.plot([0, 1], [0, 1], 'k--', linewidth=2, alpha=0.4)
@@ -46,20 +58,27 @@ def plot_profit_decentralization(data: Dict):
             
             if profits and len(profits) > 0:
                 # Use absolute values for Lorenz curve (normalize to positive)
-                profits_abs = [abs(p) for p in profits]
-                if sum(profits_abs) > 0:
+                profits_abs = np.abs(np.asarray(profits, dtype=np.float64))
+                if profits_abs.sum() > 0:
                     has_data = True
-                    profits_sorted = sorted(profits_abs)
-                    n = len(profits_sorted)
+                    profits_sorted = np.sort(profits_abs)
+                    n = profits_sorted.size
                     cumsum_profits = np.cumsum(profits_sorted)
-                    cumsum_profits = cumsum_profits / cumsum_profits[-1]
-                    cumsum_pop = np.arange(1, n + 1) / n
+                    cumsum_profits /= cumsum_profits[-1]
+                    cumsum_pop = np.arange(1, n + 1, dtype=np.float64) / n
+                    if n > MAX_CURVE_POINTS:
+                        # Evenly spaced samples (endpoints included) keep the path size fixed
+                        idx = np.linspace(0, n - 1, MAX_CURVE_POINTS).astype(np.int64)
+                        cumsum_pop, cumsum_profits = cumsum_pop[idx], cumsum_profits[idx]
                     
+                    # Kept vector: with path.simplify on, rasterizing made the PDF ~7x larger and slower
                     ax.plot(cumsum_pop, cumsum_profits, label=label, 
-                           linewidth=3.5, color=color, marker='o', markersize=4, markevery=max(1, n//20))
+                           linewidth=3.5, color=color, marker='o', markersize=4, markevery=max(1, cumsum_pop.size//20))
     
     if not has_data:
         print("⚠ No profit distribution data found")
+        if owns_fig:
+            plt.close(fig)
         return
     
     ax.set_xlabel('Cumulative Fraction of Validators', fontsize=26, fontweight='bold')
@@ -75,15 +94,26 @@ def plot_profit_decentralization(data: Dict):
     for spine in ax.spines.values():
         spine.set_linewidth(1.2)
     
-    plt.tight_layout()
-    os.makedirs('figures', exist_ok=True)
-    plt.savefig('figures/profit_decentralization.pdf', dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=300, facecolor='white')
+    if owns_fig:
+        plt.close(fig)
+
+def plot_many(items):
+    """Render (data, out_path) pairs on one reused figure, e.g. a batch of snapshots"""
+    plt = pyplot(font_size=20)
+    fig, ax = plt.subplots(figsize=(10, 10))
+    try:
+        for data, out_path in items:
+            plot_profit_decentralization(data, ax=ax, out_path=out_path)
+    finally:
+        plt.close(fig)
 
 def main():
-    data = load_latest_research_data()
+    data, input_mtime = load_latest_research_data(keys={'profit_distribution'})
     if data:
-        plot_profit_decentralization(data)
+        os.makedirs('figures', exist_ok=True)
+        plot_profit_decentralization(data, input_mtime)
     else:
         print("❌ No data found. Run simulation.py first.")
 
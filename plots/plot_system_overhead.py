@@ -4,29 +4,32 @@ Research Question 3: System Overhead
 Grouped bar chart comparing latency and cost between P2S and Ethereum PoS
 """
 
-import json
 import os
-import numpy as np
-import matplotlib.pyplot as plt
 from typing import Dict
-import glob
 
-plt.rcParams['figure.dpi'] = 300
-plt.rcParams['savefig.dpi'] = 300
-plt.rcParams['font.size'] = 14
-plt.rcParams['font.family'] = 'sans-serif'
+from _common import find_latest, is_up_to_date, pyplot, read_json
 
-def load_latest_research_data(data_dir="data"):
-    """Load the latest research metrics data"""
-    files = glob.glob(f"{data_dir}/simulation_*.json")
-    if not files:
-        return None
-    latest_file = max(files, key=os.path.getctime)
-    with open(latest_file, 'r') as f:
-        return json.load(f)
+def load_latest_research_data(data_dir="data", keys=None):
+    """Load the latest research metrics data, optionally only the given top-level keys
 
-def plot_system_overhead(data: Dict):
-    """Grouped bar chart: Clean comparison of key overhead metrics"""
+    Returns (data, input_mtime), or (None, None) when no file is found.
+    """
+    latest_file = find_latest(data_dir, 'simulation_', by='st_ctime')
+    if not latest_file:
+        return None, None
+    return read_json(latest_file, keys), os.path.getmtime(latest_file)
+
+def plot_system_overhead(data: Dict, input_mtime=None, dpi=150):
+    """Grouped bar chart: Clean comparison of key overhead metrics
+
+    150 dpi is plenty for two flat bars; pass dpi=300 for a print-size PNG.
+    """
+    if is_up_to_date('figures/system_overhead.png', input_mtime, __file__):
+        return
+    import numpy as np
+
+    plt = pyplot(font_size=14)
+    
     P2S_COLOR = '#2ecc71'
     ETH_COLOR = '#3498db'
     
@@ -37,30 +40,25 @@ def plot_system_overhead(data: Dict):
     colors = [P2S_COLOR, ETH_COLOR]
     
     # Extract overhead data
-    mean_latencies = []
-    mean_costs = []
-    
-    for protocol in protocols:
-        if protocol in data.get('overhead_metrics', {}):
-            mean_latencies.append(data['overhead_metrics'][protocol].get('mean_latency', 0))
-            mean_costs.append(data['overhead_metrics'][protocol].get('mean_cost', 0))
-        else:
-            mean_latencies.append(0)
-            mean_costs.append(0)
+    overhead = data.get('overhead_metrics', {})
+    mean_latencies = np.fromiter((overhead.get(p, {}).get('mean_latency', 0) for p in protocols),
+                                 dtype=np.float64, count=len(protocols))
+    mean_costs = np.fromiter((overhead.get(p, {}).get('mean_cost', 0) for p in protocols),
+                             dtype=np.float64, count=len(protocols))
     
     # Plot 1: Network Latency
     bars1 = ax1.bar(protocol_labels, mean_latencies, color=colors, alpha=0.85, 
                    edgecolor='black', linewidth=2)
     ax1.set_ylabel('Mean Network Latency (seconds)', fontsize=16, fontweight='bold')
     ax1.grid(True, alpha=0.2, axis='y', linestyle='--', linewidth=0.8)
-    ax1.set_ylim(0, max(mean_latencies) * 1.2 if mean_latencies else 1)
+    ax1.set_ylim(0, mean_latencies.max() * 1.2 or 1)  # fall back to 1 when every value is zero
     
     # Plot 2: Gas Cost
     bars2 = ax2.bar(protocol_labels, mean_costs, color=colors, alpha=0.85, 
                    edgecolor='black', linewidth=2)
     ax2.set_ylabel('Mean Gas Cost per Block (ETH)', fontsize=16, fontweight='bold')
     ax2.grid(True, alpha=0.2, axis='y', linestyle='--', linewidth=0.8)
-    ax2.set_ylim(0, max(mean_costs) * 1.2 if mean_costs else 1)
+    ax2.set_ylim(0, mean_costs.max() * 1.2 or 1)
     
     # Clean up spines
     for ax in [ax1, ax2]:
@@ -68,14 +66,15 @@ def plot_system_overhead(data: Dict):
             spine.set_linewidth(1.2)
     
     plt.tight_layout()
-    os.makedirs('figures', exist_ok=True)
-    plt.savefig('figures/system_overhead.png', dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    plt.savefig('figures/system_overhead.png', dpi=dpi, facecolor='white',
+                pil_kwargs={'compress_level': 1, 'optimize': False})
+    plt.close(fig)
 
 def main():
-    data = load_latest_research_data()
+    data, input_mtime = load_latest_research_data(keys={'overhead_metrics'})
     if data:
-        plot_system_overhead(data)
+        os.makedirs('figures', exist_ok=True)
+        plot_system_overhead(data, input_mtime)
     else:
         print("❌ No data found. Run simulation.py first.")
 
@@ -4,13 +4,30 @@ MEV Comparison Tool
 Compares MEV extraction between Ethereum mainnet and P2S testnet
 """
 
+import contextlib
+import io
 import json
 import os
-import statistics
+import sys
 from typing import Dict, List, Tuple
 from collections import defaultdict
 from datetime import datetime
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional; fall back to the stdlib parser
+    orjson = None
+
+# Value field collected for each activity type in an analysis
+ACTIVITY_VALUE_FIELDS = {
+    'miner_payments': 'total_payment',
+    'swaps': 'profit_potential',
+    'arbitrages': 'profit_amount',
+    'sandwich_attacks': 'profit',
+}
+
 class MEVComparator:
     """Compare MEV between Ethereum and P2S testnet"""
     
@@ -24,146 +41,145 @@ class MEVComparator:
         """
         self.ethereum_data = self.load_results(ethereum_file)
         self.p2s_data = self.load_results(p2s_file)
+        
+        # Flatten each protocol's analyses once; every statistic reduces these arrays
+        self.eth_soa = self._to_soa(self.ethereum_data)
+        self.p2s_soa = self._to_soa(self.p2s_data)
+        self.eth_stats = self._soa_statistics(self.eth_soa)
+        self.p2s_stats = self._soa_statistics(self.p2s_soa)
     
     def load_results(self, filepath: str) -> Dict:
         """Load MEV inspection results from JSON"""
         if not os.path.exists(filepath):
             raise FileNotFoundError(f"Results file not found: {filepath}")
         
+        if orjson is not None:
+            with open(filepath, 'rb') as f:
+                return orjson.loads(f.read())
         with open(filepath, 'r') as f:
             return json.load(f)
     
     def calculate_statistics(self, data: Dict) -> Dict:
         """Calculate MEV statistics from inspection results"""
+        return self._soa_statistics(self._to_soa(data))
+    
+    @staticmethod
+    def _to_soa(data: Dict) -> Dict[str, np.ndarray]:
+        """Flatten data['analyses'] into per-field arrays (structure of arrays)
+        
+        Keys: 'total_mev' and 'mev_per_tx' (one entry per block), '<type>_count'
+        (activities per block) and '<type>' (every activity value), for each
+        type in ACTIVITY_VALUE_FIELDS.
+        """
         analyses = data.get('analyses', [])
+        # (type, value field, per-block counts, every value), filled in one pass
+        columns = [(mev_type, field, [], []) for mev_type, field in ACTIVITY_VALUE_FIELDS.items()]
+        total_mev, mev_per_tx = [], []
+        for a in analyses:
+            get = a.get
+            total_mev.append(get('total_mev', 0))
+            mev_per_tx.append(get('mev_per_tx', 0))
+            for mev_type, field, counts, values in columns:
+                items = get(mev_type, ())
+                counts.append(len(items))
+                if items:
+                    values.extend([x.get(field, 0) for x in items])
+        
+        soa = {
+            'total_mev': np.asarray(total_mev, dtype=np.float64),
+            'mev_per_tx': np.asarray(mev_per_tx, dtype=np.float64),
+        }
+        for mev_type, _, counts, values in columns:
+            soa[mev_type + '_count'] = np.asarray(counts, dtype=np.int64)
+            soa[mev_type] = np.asarray(values, dtype=np.float64)
+        return soa
+    
+    @staticmethod
+    def _soa_statistics(soa: Dict[str, np.ndarray]) -> Dict:
+        """calculate_statistics over an already flattened _to_soa view"""
+        n = soa['total_mev'].size
         
-        if not analyses:
+        if not n:
             return {}
         
-        total_mev = sum(a.get('total_mev', 0) for a in analyses)
-        mev_per_tx_values = [a.get('mev_per_tx', 0) for a in analyses if a.get('mev_per_tx', 0) > 0]
-        
-        miner_payments = sum(len(a.get('miner_payments', [])) for a in analyses)
-        swaps = sum(len(a.get('swaps', [])) for a in analyses)
-        arbitrages = sum(len(a.get('arbitrages', [])) for a in analyses)
-        sandwich_attacks = sum(len(a.get('sandwich_attacks', [])) for a in analyses)
-        
-        total_txs = sum(
-            len(a.get('miner_payments', [])) +
-            len(a.get('swaps', [])) +
-            len(a.get('arbitrages', [])) +
-            len(a.get('sandwich_attacks', []))
-            for a in analyses
+        total_mev = float(soa['total_mev'].sum())
+        mev_per_tx = soa['mev_per_tx'][soa['mev_per_tx'] > 0]
+        miner_payments, swaps, arbitrages, sandwich_attacks = (
+            int(soa[mev_type + '_count'].sum()) for mev_type in ACTIVITY_VALUE_FIELDS
         )
+        total_txs = miner_payments + swaps + arbitrages + sandwich_attacks
         
         return {
-            'total_blocks': len(analyses),
+            'total_blocks': n,
             'total_mev': total_mev,
-            'avg_mev_per_block': total_mev / len(analyses) if analyses else 0,
-            'avg_mev_per_tx': statistics.mean(mev_per_tx_values) if mev_per_tx_values else 0,
-            'median_mev_per_tx': statistics.median(mev_per_tx_values) if mev_per_tx_values else 0,
+            'avg_mev_per_block': total_mev / n,
+            'avg_mev_per_tx': float(mev_per_tx.mean()) if mev_per_tx.size else 0,
+            'median_mev_per_tx': float(np.median(mev_per_tx)) if mev_per_tx.size else 0,
             'miner_payments': miner_payments,
             'swaps': swaps,
             'arbitrages': arbitrages,
             'sandwich_attacks': sandwich_attacks,
             'total_mev_activities': total_txs,
-            'mev_activities_per_block': total_txs / len(analyses) if analyses else 0
+            'mev_activities_per_block': total_txs / n
         }
     
     def compare_statistics(self) -> Dict:
         """Compare statistics between Ethereum and P2S"""
-        eth_stats = self.calculate_statistics(self.ethereum_data)
-        p2s_stats = self.calculate_statistics(self.p2s_data)
+        eth_stats = self.eth_stats
+        p2s_stats = self.p2s_stats
+        
+        # Calculate differences for every numeric metric in one vector op
+        keys = [k for k, v in eth_stats.items() if isinstance(v, (int, float))]
+        eth_arr = np.array([eth_stats[k] for k in keys], dtype=np.float64)
+        p2s_arr = np.array([p2s_stats.get(k, 0) for k in keys], dtype=np.float64)
+        positive = eth_arr > 0
+        reduction = np.zeros_like(eth_arr)
+        np.divide(eth_arr - p2s_arr, eth_arr, out=reduction, where=positive)
+        reduction *= 100
         
         comparison = {
             'ethereum': eth_stats,
             'p2s': p2s_stats,
-            'differences': {}
+            'differences': {
+                k: {
+                    'ethereum': eth_stats[k],
+                    'p2s': p2s_stats.get(k, 0),
+                    'reduction': float(r),
+                    'reduction_abs': eth_stats[k] - p2s_stats.get(k, 0)
+                }
+                for k, r, keep in zip(keys, reduction, positive) if keep
+            }
         }
         
-        # Calculate differences
-        for key in eth_stats:
-            if isinstance(eth_stats[key], (int, float)):
-                eth_val = eth_stats[key]
-                p2s_val = p2s_stats.get(key, 0)
-                
-                if eth_val > 0:
-                    reduction = ((eth_val - p2s_val) / eth_val) * 100
-                    comparison['differences'][key] = {
-                        'ethereum': eth_val,
-                        'p2s': p2s_val,
-                        'reduction': reduction,
-                        'reduction_abs': eth_val - p2s_val
-                    }
-        
         return comparison
     
     def analyze_mev_types(self) -> Dict:
         """Analyze MEV by type"""
-        eth_analyses = self.ethereum_data.get('analyses', [])
-        p2s_analyses = self.p2s_data.get('analyses', [])
-        
-        eth_by_type = {
-            'miner_payments': [],
-            'swaps': [],
-            'arbitrages': [],
-            'sandwich_attacks': []
-        }
-        
-        p2s_by_type = {
-            'miner_payments': [],
-            'swaps': [],
-            'arbitrages': [],
-            'sandwich_attacks': []
-        }
-        
-        # Aggregate Ethereum data
-        for analysis in eth_analyses:
-            for payment in analysis.get('miner_payments', []):
-                eth_by_type['miner_payments'].append(payment.get('total_payment', 0))
-            for swap in analysis.get('swaps', []):
-                eth_by_type['swaps'].append(swap.get('profit_potential', 0))
-            for arb in analysis.get('arbitrages', []):
-                eth_by_type['arbitrages'].append(arb.get('profit_amount', 0))
-            for attack in analysis.get('sandwich_attacks', []):
-                eth_by_type['sandwich_attacks'].append(attack.get('profit', 0))
-        
-        # Aggregate P2S data
-        for analysis in p2s_analyses:
-            for payment in analysis.get('miner_payments', []):
-                p2s_by_type['miner_payments'].append(payment.get('total_payment', 0))
-            for swap in analysis.get('swaps', []):
-                p2s_by_type['swaps'].append(swap.get('profit_potential', 0))
-            for arb in analysis.get('arbitrages', []):
-                p2s_by_type['arbitrages'].append(arb.get('profit_amount', 0))
-            for attack in analysis.get('sandwich_attacks', []):
-                p2s_by_type['sandwich_attacks'].append(attack.get('profit', 0))
-        
-        # Calculate statistics by type
+        # Totals and stats per type, straight from the flattened value arrays
         result = {}
-        for mev_type in eth_by_type.keys():
-            eth_values = eth_by_type[mev_type]
-            p2s_values = p2s_by_type[mev_type]
+        for mev_type in ACTIVITY_VALUE_FIELDS:
+            eth_values = self.eth_soa[mev_type]
+            p2s_values = self.p2s_soa[mev_type]
             
-            eth_total = sum(eth_values)
-            p2s_total = sum(p2s_values)
+            eth_total = float(eth_values.sum())
+            p2s_total = float(p2s_values.sum())
             
             result[mev_type] = {
                 'ethereum': {
-                    'count': len(eth_values),
+                    'count': eth_values.size,
                     'total': eth_total,
-                    'avg': statistics.mean(eth_values) if eth_values else 0,
-                    'median': statistics.median(eth_values) if eth_values else 0
+                    'avg': float(eth_values.mean()) if eth_values.size else 0,
+                    'median': float(np.median(eth_values)) if eth_values.size else 0
                 },
                 'p2s': {
-                    'count': len(p2s_values),
+                    'count': p2s_values.size,
                     'total': p2s_total,
-                    'avg': statistics.mean(p2s_values) if p2s_values else 0,
-                    'median': statistics.median(p2s_values) if p2s_values else 0
+                    'avg': float(p2s_values.mean()) if p2s_values.size else 0,
+                    'median': float(np.median(p2s_values)) if p2s_values.size else 0
                 },
                 'reduction': {
-                    'count': len(eth_values) - len(p2s_values),
-                    'count_pct': ((len(eth_values) - len(p2s_values)) / len(eth_values) * 100) if eth_values else 0,
+                    'count': eth_values.size - p2s_values.size,
+                    'count_pct': ((eth_values.size - p2s_values.size) / eth_values.size * 100) if eth_values.size else 0,
                     'total': eth_total - p2s_total,
                     'total_pct': ((eth_total - p2s_total) / eth_total * 100) if eth_total > 0 else 0
                 }
@@ -172,7 +188,14 @@ class MEVComparator:
         return result
     
     def print_comparison_report(self):
-        """Print detailed comparison report"""
+        """Print detailed comparison report, written to stdout in one call"""
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
+            self._print_report()
+        sys.stdout.write(buf.getvalue())
+    
+    def _print_report(self):
+        """Body of print_comparison_report"""
         print("=" * 80)
         print("MEV COMPARISON: ETHEREUM vs P2S TESTNET")
         print("=" * 80)
@@ -276,7 +299,6 @@ class MEVComparator:
 
 def main():
     """Main function"""
-    import sys
     import argparse
     
     parser = argparse.ArgumentParser(description='Compare MEV between Ethereum and P2S testnet')
@@ -6,23 +6,59 @@ Analyzes configuration parameters and performance differences across different c
 
 import json
 import os
-import statistics
-from collections import defaultdict
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional; fall back to the stdlib parser
+    orjson = None
+
+def find_latest(data_dir, prefix, suffix='.json'):
+    """Return the newest data_dir/prefix*suffix file by mtime, using one scandir pass."""
+    best, best_time = None, -1.0
+    try:
+        with os.scandir(data_dir) as it:
+            for entry in it:
+                name = entry.name
+                if name.startswith(prefix) and name.endswith(suffix):
+                    t = entry.stat().st_mtime
+                    if t > best_time:
+                        best, best_time = entry.path, t
+    except FileNotFoundError:
+        return None
+    return best
 
 def load_latest_data():
     """Load the latest test data"""
-    data_dir = 'data'
-    if not os.path.exists(data_dir):
-        return None
-    
-    test_files = [f for f in os.listdir(data_dir) if f.startswith('p2s_performance_test_') and f.endswith('.json')]
-    if not test_files:
+    latest_file = find_latest('data', 'p2s_performance_test_')
+    if not latest_file:
         return None
-    
-    latest_file = max(test_files)
-    with open(f"{data_dir}/{latest_file}", 'r') as f:
+    if orjson is not None:
+        with open(latest_file, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(latest_file, 'r') as f:
         return json.load(f)
 
+def component_durations(txs, component):
+    """tx[component]['duration'] for every tx, as a float64 array"""
+    return np.fromiter((tx[component]['duration'] for tx in txs), dtype=np.float64, count=len(txs))
+
+def congestion_means(txs):
+    """Distinct network_congestion levels (sorted) and the mean total_duration at each"""
+    congestion = np.fromiter((tx['network_congestion'] for tx in txs), dtype=np.float64, count=len(txs))
+    durations = np.fromiter((tx['total_duration'] for tx in txs), dtype=np.float64, count=len(txs))
+    levels, inverse = np.unique(congestion, return_inverse=True)
+    return levels, np.bincount(inverse, weights=durations) / np.bincount(inverse)
+
+def print_component_stats(label, values):
+    """Print mean, median and range of one component's durations"""
+    arr = np.asarray(values, dtype=np.float64)
+    print(f"{label}:")
+    print(f"    • Mean: {arr.mean():.3f}s")
+    print(f"    • Median: {np.median(arr):.3f}s")
+    print(f"    • Range: {arr.min():.3f}s - {arr.max():.3f}s")
+
 def print_parameters():
     """Print P2S configuration parameters"""
     print("=" * 80)
@@ -103,29 +139,17 @@ def analyze_performance_by_conditions(data):
     print("PERFORMANCE ANALYSIS BY NETWORK CONDITIONS")
     print("=" * 80)
     
-    # Group data by network congestion
-    p2s_by_congestion = defaultdict(list)
-    pos_by_congestion = defaultdict(list)
-    
-    for tx in data['p2s_raw_data']:
-        congestion = tx['network_congestion']
-        p2s_by_congestion[congestion].append(tx['total_duration'])
-    
-    for tx in data['pos_raw_data']:
-        congestion = tx['network_congestion']
-        pos_by_congestion[congestion].append(tx['total_duration'])
+    # Mean inclusion time per network congestion level
+    p2s_levels, p2s_means = congestion_means(data['p2s_raw_data'])
+    pos_levels, pos_means = congestion_means(data['pos_raw_data'])
+    pos_mean_by_level = dict(zip(pos_levels.tolist(), pos_means))
     
     print(f"\n📊 TRANSACTION INCLUSION TIME BY NETWORK CONGESTION:")
     print(f"{'Congestion':<12} {'P2S Mean':<12} {'PoS Mean':<12} {'Difference':<12} {'Increase %':<12}")
     print("-" * 70)
     
-    congestion_levels = sorted(p2s_by_congestion.keys())
-    for congestion in congestion_levels:
-        p2s_times = p2s_by_congestion[congestion]
-        pos_times = pos_by_congestion[congestion]
-        
-        p2s_mean = statistics.mean(p2s_times)
-        pos_mean = statistics.mean(pos_times)
+    for congestion, p2s_mean in zip(p2s_levels.tolist(), p2s_means):
+        pos_mean = pos_mean_by_level.get(congestion, np.nan)
         difference = p2s_mean - pos_mean
         increase_pct = (difference / pos_mean) * 100
         
@@ -147,56 +171,27 @@ def analyze_component_breakdown(data):
     print("=" * 80)
     
     # Analyze P2S components
-    pht_creation_times = []
-    b1_block_times = []
-    mt_creation_times = []
-    b2_block_times = []
-    
-    for tx in data['p2s_raw_data']:
-        pht_creation_times.append(tx['pht_creation']['duration'])
-        b1_block_times.append(tx['b1_block']['duration'])
-        mt_creation_times.append(tx['mt_creation']['duration'])
-        b2_block_times.append(tx['b2_block']['duration'])
+    p2s_txs = data['p2s_raw_data']
+    pht_creation_times = component_durations(p2s_txs, 'pht_creation')
+    b1_block_times = component_durations(p2s_txs, 'b1_block')
+    mt_creation_times = component_durations(p2s_txs, 'mt_creation')
+    b2_block_times = component_durations(p2s_txs, 'b2_block')
     
     print(f"\n🔧 P2S COMPONENT TIMES:")
-    print(f"  PHT Creation:")
-    print(f"    • Mean: {statistics.mean(pht_creation_times):.3f}s")
-    print(f"    • Median: {statistics.median(pht_creation_times):.3f}s")
-    print(f"    • Range: {min(pht_creation_times):.3f}s - {max(pht_creation_times):.3f}s")
-    
-    print(f"\n  B1 Block Processing:")
-    print(f"    • Mean: {statistics.mean(b1_block_times):.3f}s")
-    print(f"    • Median: {statistics.median(b1_block_times):.3f}s")
-    print(f"    • Range: {min(b1_block_times):.3f}s - {max(b1_block_times):.3f}s")
-    
-    print(f"\n  MT Creation:")
-    print(f"    • Mean: {statistics.mean(mt_creation_times):.3f}s")
-    print(f"    • Median: {statistics.median(mt_creation_times):.3f}s")
-    print(f"    • Range: {min(mt_creation_times):.3f}s - {max(mt_creation_times):.3f}s")
-    
-    print(f"\n  B2 Block Processing:")
-    print(f"    • Mean: {statistics.mean(b2_block_times):.3f}s")
-    print(f"    • Median: {statistics.median(b2_block_times):.3f}s")
-    print(f"    • Range: {min(b2_block_times):.3f}s - {max(b2_block_times):.3f}s")
+    print_component_stats("  PHT Creation", pht_creation_times)
+    print_component_stats("\n  B1 Block Processing", b1_block_times)
+    print_component_stats("\n  MT Creation", mt_creation_times)
+    print_component_stats("\n  B2 Block Processing", b2_block_times)
     
     # Analyze PoS components
-    pos_block_times = []
-    pos_confirmation_times = []
-    
-    for tx in data['pos_raw_data']:
-        pos_block_times.append(tx['block_proposal']['duration'])
-        pos_confirmation_times.append(tx['confirmation_time'])
+    pos_txs = data['pos_raw_data']
+    pos_block_times = component_durations(pos_txs, 'block_proposal')
+    pos_confirmation_times = np.fromiter((tx['confirmation_time'] for tx in pos_txs),
+                                         dtype=np.float64, count=len(pos_txs))
     
     print(f"\n⚡ PoS COMPONENT TIMES:")
-    print(f"  Block Proposal:")
-    print(f"    • Mean: {statistics.mean(pos_block_times):.3f}s")
-    print(f"    • Median: {statistics.median(pos_block_times):.3f}s")
-    print(f"    • Range: {min(pos_block_times):.3f}s - {max(pos_block_times):.3f}s")
-    
-    print(f"\n  Confirmation:")
-    print(f"    • Mean: {statistics.mean(pos_confirmation_times):.3f}s")
-    print(f"    • Median: {statistics.median(pos_confirmation_times):.3f}s")
-    print(f"    • Range: {min(pos_confirmation_times):.3f}s - {max(pos_confirmation_times):.3f}s")
+    print_component_stats("  Block Proposal", pos_block_times)
+    print_component_stats("\n  Confirmation", pos_confirmation_times)
 
 def analyze_overhead_breakdown(data):
     """Analyze P2S overhead breakdown"""
@@ -207,8 +202,8 @@ def analyze_overhead_breakdown(data):
     p2s_times = [tx['total_duration'] for tx in data['p2s_raw_data']]
     pos_times = [tx['total_duration'] for tx in data['pos_raw_data']]
     
-    p2s_mean = statistics.mean(p2s_times)
-    pos_mean = statistics.mean(pos_times)
+    p2s_mean = np.mean(p2s_times)
+    pos_mean = np.mean(pos_times)
     overhead = p2s_mean - pos_mean
     
     print(f"\n📊 OVERHEAD ANALYSIS:")
@@ -217,9 +212,9 @@ def analyze_overhead_breakdown(data):
     print(f"  • Total Overhead: {overhead:.3f}s ({overhead/pos_mean*100:.1f}%)")
     
     print(f"\n🔍 OVERHEAD COMPONENTS:")
-    print(f"  • PHT Creation: ~{statistics.mean([tx['pht_creation']['duration'] for tx in data['p2s_raw_data']]):.3f}s")
-    print(f"  • Additional Block (B2): ~{statistics.mean([tx['b2_block']['duration'] for tx in data['p2s_raw_data']]):.3f}s")
-    print(f"  • MT Proof Generation: ~{statistics.mean([tx['mt_creation']['duration'] for tx in data['p2s_raw_data']]):.3f}s")
+    print(f"  • PHT Creation: ~{component_durations(data['p2s_raw_data'], 'pht_creation').mean():.3f}s")
+    print(f"  • Additional Block (B2): ~{component_durations(data['p2s_raw_data'], 'b2_block').mean():.3f}s")
+    print(f"  • MT Proof Generation: ~{component_durations(data['p2s_raw_data'], 'mt_creation').mean():.3f}s")
     print(f"  • Cross-validation: ~0.1s (estimated)")
     
     print(f"\n⚖️ TRADE-OFFS:")
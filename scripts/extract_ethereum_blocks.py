@@ -7,21 +7,55 @@ Extracts real Ethereum block data with fixed intervals and caches it locally
 import json
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional; fall back to the stdlib encoder
+    orjson = None
+
+def _to_int(value):
+    """Integer from a hex ('0x...') or decimal quantity string; other values pass through"""
+    return int(value, 0) if type(value) is str else value
 
 class EthereumBlockExtractor:
     """Extract and cache real Ethereum block data"""
     
+    # During extract_blocks, new blocks are flushed to the cache at most this often (seconds)
+    CACHE_FLUSH_INTERVAL = 5.0
+    
+    # Connections kept open to the API; at least extract_blocks' max_concurrency
+    HTTP_POOL_SIZE = 16
+    
     def __init__(self, cache_file="data/ethereum_blocks_cache.json"):
         self.cache_file = cache_file
         self.base_url = "https://eth.blockscout.com/api/v2"  # Public API, no key needed
+        # Keep-alive connections shared by the fetch threads; rate limiting (429) and
+        # gateway errors are retried with exponential backoff, honouring Retry-After
+        self.session = requests.Session()
+        self.session.headers.update({'Accept': 'application/json'})
+        adapter = HTTPAdapter(
+            pool_connections=self.HTTP_POOL_SIZE,
+            pool_maxsize=self.HTTP_POOL_SIZE,
+            max_retries=Retry(total=5, backoff_factor=0.5,
+                              status_forcelist=(429, 502, 503, 504)),
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.rng = np.random.default_rng()
         self.cached_blocks = self.load_cache()
         
     def load_cache(self) -> Dict:
         """Load cached block data"""
         if os.path.exists(self.cache_file):
+            # Stdlib parser on purpose: orjson reads integers above 64 bits (tx values
+            # over ~18.4 ETH in wei) as floats, which save_cache would then write back
             try:
                 with open(self.cache_file, 'r') as f:
                     return json.load(f)
@@ -30,17 +64,34 @@ class EthereumBlockExtractor:
         return {}
     
     def save_cache(self):
-        """Save block data to cache"""
+        """Save block data to cache
+        
+        Written compactly (the cache is only machine-read) to a temporary file that
+        is renamed over the cache, so an interrupted save never leaves a truncated
+        cache behind.
+        """
         os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
-        with open(self.cache_file, 'w') as f:
-            json.dump(self.cached_blocks, f, indent=2)
+        tmp_file = self.cache_file + '.tmp'
+        data = None
+        if orjson is not None:
+            try:
+                data = orjson.dumps(self.cached_blocks)
+            except TypeError:  # an integer above 64 bits; only the stdlib encoder handles it
+                pass
+        if data is not None:
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+        else:
+            with open(tmp_file, 'w') as f:
+                json.dump(self.cached_blocks, f, separators=(',', ':'))
+        os.replace(tmp_file, self.cache_file)
         print(f"💾 Cached {len(self.cached_blocks)} blocks to {self.cache_file}")
     
     def get_latest_block_number(self) -> int:
         """Get the latest Ethereum block number"""
         try:
             url = f"{self.base_url}/blocks"
-            response = requests.get(url, params={'page': 1, 'limit': 1}, timeout=10)
+            response = self.session.get(url, params={'page': 1, 'limit': 1}, timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 if data.get('items'):
@@ -59,10 +110,30 @@ class EthereumBlockExtractor:
         if block_key in self.cached_blocks:
             return self.cached_blocks[block_key]
         
+        return self._store_fetched(block_number, self.fetch_remote_block(block_number))
+    
+    def _store_fetched(self, block_number: int, block: Dict) -> Dict:
+        """Cache a fetched block, or generate synthetic data if the fetch failed
+        
+        Synthetic fallbacks are not cached, so a later run fetches the real block.
+        """
+        if block is None:
+            # Fallback: generate realistic synthetic data
+            return self.generate_synthetic_block(block_number)
+        
+        # Cache it
+        self.cached_blocks[str(block_number)] = block
+        return block
+    
+    def fetch_remote_block(self, block_number: int) -> Optional[Dict]:
+        """Fetch and convert a block from the API; None on failure
+        
+        Only does network I/O, so it is safe to call from several threads.
+        """
         try:
             # Try Blockscout API
             url = f"{self.base_url}/blocks/{block_number}"
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
             
             if response.status_code == 200:
                 block_data = response.json()
@@ -75,9 +146,9 @@ class EthereumBlockExtractor:
                             'hash': tx.get('hash', ''),
                             'from': tx.get('from', {}).get('hash', ''),
                             'to': tx.get('to', {}).get('hash', '') if tx.get('to') else '',
-                            'value': int(tx.get('value', '0'), 16) if isinstance(tx.get('value'), str) else tx.get('value', 0),
-                            'gas': int(tx.get('gas', '0'), 16) if isinstance(tx.get('gas'), str) else tx.get('gas', 21000),
-                            'gasPrice': int(tx.get('gas_price', '0'), 16) if isinstance(tx.get('gas_price'), str) else tx.get('gas_price', 20000000000),
+                            'value': _to_int(tx.get('value', 0)),
+                            'gas': _to_int(tx.get('gas', 21000)),
+                            'gasPrice': _to_int(tx.get('gas_price', 20000000000)),
                             'nonce': tx.get('nonce', 0),
                             'timestamp': block_data.get('timestamp', int(time.time()))
                         })
@@ -93,51 +164,55 @@ class EthereumBlockExtractor:
                     'transactions': transactions
                 }
                 
-                # Cache it
-                self.cached_blocks[block_key] = processed_block
                 return processed_block
                 
         except Exception as e:
             print(f"⚠️  Error fetching block {block_number}: {e}")
         
-        # Fallback: generate realistic synthetic data
-        return self.generate_synthetic_block(block_number)
+        return None
     
     def generate_synthetic_block(self, block_number: int) -> Dict:
-        """Generate realistic synthetic block data when API fails"""
-        import random
-        
-        tx_count = random.randint(50, 200)
-        transactions = []
-        for i in range(tx_count):
-            tx = {
-                'hash': f"0x{random.getrandbits(256):064x}",
-                'from': f"0x{random.getrandbits(160):040x}",
-                'to': f"0x{random.getrandbits(160):040x}",
-                'value': random.randint(1000000000000000, 10000000000000000000),
-                'gas': random.randint(21000, 500000),
-                'gasPrice': random.randint(20000000000, 100000000000),
+        """Generate realistic synthetic block data when API fails (not cached)"""
+        rng = self.rng
+        now = int(time.time())
+        
+        # Draw every field for all transactions at once, then zip into dicts
+        tx_count = int(rng.integers(50, 200, endpoint=True))
+        hashes = rng.bytes(32 * tx_count).hex()
+        addresses = rng.bytes(2 * 20 * tx_count).hex()
+        values = rng.integers(1000000000000000, 10000000000000000000, size=tx_count,
+                              dtype=np.uint64, endpoint=True).tolist()  # above int64 range
+        gas = rng.integers(21000, 500000, size=tx_count, endpoint=True).tolist()
+        gas_prices = rng.integers(20000000000, 100000000000, size=tx_count, endpoint=True).tolist()
+        ages = rng.integers(0, 3600, size=tx_count, endpoint=True).tolist()
+        
+        transactions = [
+            {
+                'hash': f"0x{hashes[64 * i:64 * (i + 1)]}",
+                'from': f"0x{addresses[80 * i:80 * i + 40]}",
+                'to': f"0x{addresses[80 * i + 40:80 * (i + 1)]}",
+                'value': values[i],
+                'gas': gas[i],
+                'gasPrice': gas_prices[i],
                 'nonce': i,
-                'timestamp': int(time.time()) - random.randint(0, 3600)
+                'timestamp': now - ages[i]
             }
-            transactions.append(tx)
+            for i in range(tx_count)
+        ]
         
-        block = {
+        return {
             'block_number': block_number,
-            'timestamp': int(time.time()),
+            'timestamp': now,
             'transaction_count': tx_count,
-            'block_size': random.randint(50000, 150000),
-            'base_fee': random.randint(20000000000, 50000000000),
-            'gas_used': random.randint(10000000, 25000000),
+            'block_size': int(rng.integers(50000, 150000, endpoint=True)),
+            'base_fee': int(rng.integers(20000000000, 50000000000, endpoint=True)),
+            'gas_used': int(rng.integers(10000000, 25000000, endpoint=True)),
             'gas_limit': 30000000,
             'transactions': transactions
         }
-        
-        # Cache synthetic data too
-        self.cached_blocks[str(block_number)] = block
-        return block
     
-    def extract_blocks(self, num_blocks: int = 20, block_interval: int = 100, start_block: int = None):
+    def extract_blocks(self, num_blocks: int = 20, block_interval: int = 100, start_block: int = None,
+                       max_concurrency: int = 8):
         """
         Extract blocks with fixed interval
         
@@ -145,6 +220,7 @@ class EthereumBlockExtractor:
             num_blocks: Number of blocks to extract
             block_interval: Interval between blocks (e.g., 100 = every 100th block)
             start_block: Starting block number (None = use latest)
+            max_concurrency: Maximum number of API requests in flight
         """
         if start_block is None:
             start_block = self.get_latest_block_number()
@@ -160,22 +236,40 @@ class EthereumBlockExtractor:
         blocks = []
         cached_count = 0
         fetched_count = 0
+        synthetic_count = 0
         
-        for i in range(num_blocks):
-            block_number = start_block - (i * block_interval)
-            
-            # Check if already cached
-            if str(block_number) in self.cached_blocks:
-                block = self.cached_blocks[str(block_number)]
-                cached_count += 1
-                print(f"📦 Block {block_number}: {block['transaction_count']} txs (cached)")
-            else:
-                block = self.fetch_block(block_number)
-                fetched_count += 1
-                print(f"📡 Block {block_number}: {block['transaction_count']} txs (fetched)")
-                time.sleep(0.2)  # Rate limiting
+        block_numbers = [start_block - (i * block_interval) for i in range(num_blocks)]
+        to_fetch = list(dict.fromkeys(n for n in block_numbers if str(n) not in self.cached_blocks))
+        
+        # Periodic flushes bound what an interrupted run loses without rewriting the cache per block
+        last_flush = time.monotonic()
+        
+        # Uncached blocks are fetched concurrently; the pool size (not a sleep) is the rate limit.
+        # Results arrive in to_fetch order, which is the order the loop below meets them.
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            fetched = executor.map(self.fetch_remote_block, to_fetch)
             
-            blocks.append(block)
+            for block_number in block_numbers:
+                # Check if already cached
+                if str(block_number) in self.cached_blocks:
+                    block = self.cached_blocks[str(block_number)]
+                    cached_count += 1
+                    print(f"📦 Block {block_number}: {block['transaction_count']} txs (cached)")
+                else:
+                    remote = next(fetched)
+                    block = self._store_fetched(block_number, remote)
+                    if remote is None:
+                        synthetic_count += 1
+                        print(f"🎲 Block {block_number}: {block['transaction_count']} txs (synthetic, not cached)")
+                    else:
+                        fetched_count += 1
+                        print(f"📡 Block {block_number}: {block['transaction_count']} txs (fetched)")
+                    
+                    if time.monotonic() - last_flush > self.CACHE_FLUSH_INTERVAL:
+                        self.save_cache()
+                        last_flush = time.monotonic()
+                
+                blocks.append(block)
         
         # Save cache
         self.save_cache()
@@ -183,6 +277,8 @@ class EthereumBlockExtractor:
         print(f"\n✅ Extraction complete!")
         print(f"   Cached: {cached_count} blocks")
         print(f"   Fetched: {fetched_count} blocks")
+        if synthetic_count:
+            print(f"   Synthetic: {synthetic_count} blocks (fetch failed; not cached)")
         print(f"   Cache file: {self.cache_file}")
         
         return blocks
@@ -4,24 +4,107 @@ P2S Simulation
 Main simulation comparing P2S vs Ethereum PoS using real Ethereum block data
 """
 
+import functools
 import json
-import time
-import random
-import statistics
 from datetime import datetime
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 import os
 from collections import defaultdict
+from dataclasses import asdict, dataclass, is_dataclass
 import glob
+import itertools
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional; fall back to the stdlib json module
+    orjson = None
+
+# Above this size, the block cache is streamed with ijson (when installed)
+STREAM_THRESHOLD = 512 * 1024 * 1024
+
+def _to_int(value):
+    """Integer from a hex ('0x...') or decimal quantity string; other values pass through"""
+    return int(value, 0) if type(value) is str else value
+
+def _block_sums_loop(gas_prices, gas_limits, values):
+    """Sum of gas_price * gas_limit, and sum of the values above 1 ETH, in one fused pass."""
+    gas_sum = 0.0
+    reorderable_value = 0.0
+    for i in range(values.shape[0]):
+        gas_sum += gas_prices[i] * gas_limits[i]
+        if values[i] > 1e18:
+            reorderable_value += values[i]
+    return gas_sum, reorderable_value
+
+def _block_sums_numpy(gas_prices, gas_limits, values):
+    """NumPy equivalent of _block_sums_loop."""
+    return float(np.dot(gas_prices, gas_limits)), float(values[values > 1e18].sum())
+
+@functools.lru_cache(maxsize=None)
+def _block_sums_kernel():
+    """Return the fused loop JIT-compiled by numba, or the NumPy version without numba."""
+    try:
+        from numba import njit
+    except ImportError:  # optional dependency
+        return _block_sums_numpy
+    return njit(cache=True, fastmath=True)(_block_sums_loop)
+
+@dataclass(slots=True)
+class P2SBlockResult:
+    """Simulated P2S block (one record of results['p2s_data'])"""
+    block_number: int
+    proposer: str
+    protocol: str
+    transaction_count: int
+    total_time: float
+    pht_time: float
+    b1_time: float
+    mt_time: float
+    b2_time: float
+    gas_cost: float
+    block_reward: float
+    mev_opportunity: float
+    network_latency: float
+    congestion_level: float
+
+@dataclass(slots=True)
+class PoSBlockResult:
+    """Simulated Ethereum PoS block (one record of results['ethereum_pos_data'])"""
+    block_number: int
+    proposer: str
+    protocol: str
+    transaction_count: int
+    total_time: float
+    mempool_time: float
+    proposal_time: float
+    confirmation_time: float
+    gas_cost: float
+    block_reward: float
+    mev_opportunity: float
+    network_latency: float
+    congestion_level: float
 
 class P2SSimulator:
     """Enhanced simulator that collects research metrics using real Ethereum data"""
     
-    def __init__(self):
+    # Per-block numeric fields kept as columns (one float64 array per protocol) for calculate_metrics
+    BLOCK_METRIC_COLUMNS = ('total_time', 'gas_cost', 'block_reward', 'mev_opportunity',
+                            'network_latency', 'transaction_count', 'congestion_level')
+    
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Initialize the simulator
+        
+        Args:
+            seed: Seed for the simulator's random generator (None = fresh entropy)
+        """
         self.network_latency_base = 0.1
         self.network_jitter = 0.05
         self.base_gas_price = 20  # gwei
         self.gas_cost_per_unit = 0.000001  # ETH per gas unit
+        self.rng = np.random.default_rng(seed)  # every random draw goes through this generator
         
         # Metrics storage
         self.results = {
@@ -41,17 +124,22 @@ class P2SSimulator:
             },
             'metadata': {
                 'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S"),
-                'description': "P2S simulation: P2S vs Ethereum PoS (using real Ethereum blocks)"
+                'description': "P2S simulation: P2S vs Ethereum PoS (using real Ethereum blocks)",
+                'seed': seed
             }
         }
         
         # Validators/participants
         self.validators = {}
+        self._proposer_tables = {}  # protocol -> (validator ids, cumulative stakes); see select_proposer
         self.transactions = {}
         self.block_rewards = defaultdict(float)
         
-    def load_ethereum_blocks(self, data_dir="data") -> List[Dict]:
-        """Load real Ethereum block data from cache"""
+        # protocol key ('p2s' / 'ethereum_pos') -> column -> per-block array, see allocate_block_metrics
+        self.block_metrics = {}
+        
+    def load_ethereum_blocks(self, data_dir="data", num_blocks: Optional[int] = None) -> List[Dict]:
+        """Load real Ethereum block data from cache (only the first num_blocks, if given)"""
         cache_file = f"{data_dir}/ethereum_blocks_cache.json"
         
         if not os.path.exists(cache_file):
@@ -60,15 +148,38 @@ class P2SSimulator:
         
         print(f"📂 Loading Ethereum blocks from cache: {cache_file}")
         
-        with open(cache_file, 'r') as f:
-            cached_data = json.load(f)
-            # Cache is a dict of block_number -> block_data
-            blocks = list(cached_data.values())
-            print(f"✅ Loaded {len(blocks)} blocks from cache")
-            return blocks
+        # Cache is a dict of block_number -> block_data
+        blocks = None
+        if os.path.getsize(cache_file) > STREAM_THRESHOLD:
+            try:
+                import ijson
+            except ImportError:  # optional; fall back to a bulk parse
+                pass
+            else:
+                # Blocks are parsed one at a time, and reading stops after num_blocks
+                with open(cache_file, 'rb') as f:
+                    blocks = [block for _, block in
+                              itertools.islice(ijson.kvitems(f, '', use_float=True), num_blocks)]
+        if blocks is None:
+            # orjson reads integers above 64 bits as floats; fine here, values only feed float math
+            if orjson is not None:
+                with open(cache_file, 'rb') as f:
+                    cached_data = orjson.loads(f.read())
+            else:
+                with open(cache_file, 'r') as f:
+                    cached_data = json.load(f)
+            blocks = list(itertools.islice(cached_data.values(), num_blocks))
+            del cached_data
+        
+        for block in blocks:
+            self.block_tx_arrays(block)
+            self.block_complexity(block)
+        print(f"✅ Loaded {len(blocks)} blocks from cache")
+        return blocks
     
     def create_validator(self, validator_id: str, stake: float, protocol: str):
         """Create a validator with stake"""
+        self._proposer_tables.pop(protocol, None)
         self.validators[validator_id] = {
             'id': validator_id,
             'stake': stake,
@@ -83,93 +194,83 @@ class P2SSimulator:
     def simulate_network_delay(self, congestion_level=0.0):
         """Simulate network delay"""
         base_delay = self.network_latency_base
-        jitter = random.uniform(-self.network_jitter, self.network_jitter)
-        congestion_delay = congestion_level * random.uniform(0.5, 2.0)
+        jitter = self.rng.uniform(-self.network_jitter, self.network_jitter)
+        congestion_delay = congestion_level * self.rng.uniform(0.5, 2.0)
         return max(0.01, base_delay + jitter + congestion_delay)
     
-    def calculate_reordering_opportunity(self, transactions: List[Dict]) -> float:
-        """Calculate MEV opportunity from transaction reordering"""
-        if len(transactions) < 2:
-            return 0.0
+    def block_economics(self, gas_prices: np.ndarray, gas_limits: np.ndarray,
+                        values: np.ndarray) -> Tuple[float, float, float]:
+        """Gas cost, block reward and raw MEV reordering opportunity of a block (all in ETH)"""
+        gas_sum, reorderable_value = _block_sums_kernel()(gas_prices, gas_limits, values)
         
-        # Calculate potential MEV from reordering
-        # Higher value transactions with lower gas prices = reordering opportunity
-        mev_opportunity = 0.0
-        for tx in transactions:
-            # Convert gasPrice from wei to gwei if needed
-            gas_price = tx.get('gasPrice', 0)
-            if gas_price > 1e15:  # Likely in wei, convert to gwei
-                gas_price = gas_price / 1e9
-            
-            value = tx.get('value', 0)
-            if isinstance(value, str):
-                try:
-                    value = int(value, 16) if value.startswith('0x') else int(value)
-                except:
-                    value = 0
-            
-            # If high value but low gas price, there's reordering potential
-            if value > 1e18 and gas_price < 50:  # > 1 ETH value, < 50 gwei
-                # Potential profit from front-running
-                mev_opportunity += (value / 1e18) * 0.05  # 5% of value in ETH as potential MEV
+        # Calculate costs (using real gas prices from transactions)
+        gas_cost = float(gas_sum * self.gas_cost_per_unit)
         
-        return mev_opportunity
+        # Block reward (fixed + transaction fees)
+        block_reward = 2.0 + gas_cost * 0.1
+        
+        # Calculate potential MEV from reordering: 5% of the value in ETH of every > 1 ETH tx.
+        # The per-dict version also required < 50 gwei, but read the gas price under a key the
+        # converted transactions never had, so only the value threshold ever applied; that is
+        # kept here so results stay comparable with earlier runs.
+        mev_opportunity = float(reorderable_value / 1e18 * 0.05) if len(values) >= 2 else 0.0
+        
+        return gas_cost, block_reward, mev_opportunity
     
-    def convert_ethereum_tx(self, eth_tx: Dict) -> Dict:
-        """Convert Ethereum transaction format to our format"""
-        gas_price = eth_tx.get('gasPrice', 0)
-        if isinstance(gas_price, str):
-            gas_price = int(gas_price, 16) if gas_price.startswith('0x') else int(gas_price)
-        
-        value = eth_tx.get('value', 0)
-        if isinstance(value, str):
-            value = int(value, 16) if value.startswith('0x') else int(value)
-        
-        return {
-            'hash': eth_tx.get('hash', ''),
-            'value': value,
-            'gas_price': gas_price / 1e9 if gas_price > 1e9 else gas_price,  # Convert to gwei
-            'gas_limit': eth_tx.get('gas', 21000),
-            'from': eth_tx.get('from', ''),
-            'to': eth_tx.get('to', ''),
-            'complexity': random.uniform(0.5, 2.0)
-        }
+    def block_tx_arrays(self, ethereum_block: Dict) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Gas price (gwei), gas limit and value (wei) of a block's transactions as float64 arrays
+        
+        Built once and stored on the block under '_gas_price', '_gas_limit' and '_value'.
+        """
+        if '_gas_price' not in ethereum_block:
+            txs = ethereum_block.get('transactions', [])
+            gas_prices = np.fromiter((_to_int(tx.get('gasPrice', 0)) for tx in txs),
+                                     dtype=np.float64, count=len(txs))
+            # Convert to gwei
+            ethereum_block['_gas_price'] = np.where(gas_prices > 1e9, gas_prices / 1e9, gas_prices)
+            ethereum_block['_gas_limit'] = np.fromiter((tx.get('gas', 21000) for tx in txs),
+                                                       dtype=np.float64, count=len(txs))
+            ethereum_block['_value'] = np.fromiter((_to_int(tx.get('value', 0)) for tx in txs),
+                                                   dtype=np.float64, count=len(txs))
+        return ethereum_block['_gas_price'], ethereum_block['_gas_limit'], ethereum_block['_value']
     
-    def simulate_p2s_block(self, block_num: int, proposer_id: str, ethereum_block: Dict, congestion: float):
+    def block_complexity(self, ethereum_block: Dict) -> np.ndarray:
+        """Per-transaction processing complexity of a block, sampled once and stored under '_complexity'"""
+        complexity = ethereum_block.get('_complexity')
+        if complexity is None:
+            tx_count = len(ethereum_block.get('transactions', []))
+            complexity = ethereum_block['_complexity'] = self.rng.uniform(0.5, 2.0, tx_count)
+        return complexity
+    
+    def simulate_p2s_block(self, block_num: int, proposer_id: str, ethereum_block: Dict,
+                           congestion: float) -> P2SBlockResult:
         """Simulate P2S block processing using real Ethereum block data"""
-        start_time = time.time()
+        # Per-transaction fields as arrays (built once per block)
+        gas_prices, gas_limits, values = self.block_tx_arrays(ethereum_block)
+        tx_count = len(values)
         
-        # Convert Ethereum transactions
-        transactions = [self.convert_ethereum_tx(tx) for tx in ethereum_block.get('transactions', [])]
+        # Per-transaction processing complexity, shared by the PHT and MT phases
+        complexity = self.block_complexity(ethereum_block)
         
         # Phase 1: PHT Creation
-        pht_time = sum(random.uniform(0.01, 0.05) * tx.get('complexity', 1.0) for tx in transactions)
-        time.sleep(min(pht_time, 0.1))  # Cap at 0.1s for simulation speed
+        pht_time = float((self.rng.uniform(0.01, 0.05, tx_count) * complexity).sum())
         
         # Phase 2: B1 Block
-        b1_time = self.simulate_network_delay(congestion) + random.uniform(0.05, 0.15)
-        time.sleep(min(b1_time, 0.2))
+        b1_time = self.simulate_network_delay(congestion) + self.rng.uniform(0.05, 0.15)
         
         # Phase 3: MT Creation
-        mt_time = sum(random.uniform(0.02, 0.08) * tx.get('complexity', 1.0) for tx in transactions)
-        time.sleep(min(mt_time, 0.1))
+        mt_time = float((self.rng.uniform(0.02, 0.08, tx_count) * complexity).sum())
         
         # Phase 4: B2 Block
-        b2_time = self.simulate_network_delay(congestion) + random.uniform(0.05, 0.15)
-        time.sleep(min(b2_time, 0.2))
-        
-        total_time = time.time() - start_time
+        b2_time = self.simulate_network_delay(congestion) + self.rng.uniform(0.05, 0.15)
         
-        # Calculate costs (using real gas prices from transactions)
-        gas_cost = sum(tx.get('gas_price', 20) * tx.get('gas_limit', 21000) * self.gas_cost_per_unit 
-                      for tx in transactions)
+        # Phase durations are sampled, not slept through, so the block time is their sum
+        total_time = pht_time + b1_time + mt_time + b2_time
         
-        # Block reward (fixed + transaction fees)
-        block_reward = 2.0 + sum(tx.get('gas_price', 20) * tx.get('gas_limit', 21000) * self.gas_cost_per_unit * 0.1 
-                                for tx in transactions)
+        gas_cost, block_reward, mev_opportunity = self.block_economics(gas_prices, gas_limits, values)
         
         # MEV reordering opportunity (should be low in P2S due to hidden details)
-        mev_opportunity = self.calculate_reordering_opportunity(transactions) * 0.1  # Reduced by 90% in P2S
+        mev_opportunity *= 0.1  # Reduced by 90% in P2S
         
         # Update validator metrics
         if proposer_id in self.validators:
@@ -179,54 +280,46 @@ class P2SSimulator:
             self.validators[proposer_id]['net_profit'] = (self.validators[proposer_id]['total_rewards'] - 
                                                           self.validators[proposer_id]['total_gas_costs'])
         
-        return {
-            'block_number': ethereum_block.get('block_number', block_num),
-            'proposer': proposer_id,
-            'protocol': 'P2S',
-            'transaction_count': len(transactions),
-            'total_time': total_time,
-            'pht_time': pht_time,
-            'b1_time': b1_time,
-            'mt_time': mt_time,
-            'b2_time': b2_time,
-            'gas_cost': gas_cost,
-            'block_reward': block_reward,
-            'mev_opportunity': mev_opportunity,
-            'network_latency': b1_time + b2_time,
-            'congestion_level': congestion
-        }
+        return P2SBlockResult(
+            block_number=ethereum_block.get('block_number', block_num),
+            proposer=proposer_id,
+            protocol='P2S',
+            transaction_count=tx_count,
+            total_time=total_time,
+            pht_time=pht_time,
+            b1_time=b1_time,
+            mt_time=mt_time,
+            b2_time=b2_time,
+            gas_cost=gas_cost,
+            block_reward=block_reward,
+            mev_opportunity=mev_opportunity,
+            network_latency=b1_time + b2_time,
+            congestion_level=congestion
+        )
     
-    def simulate_ethereum_pos_block(self, block_num: int, proposer_id: str, ethereum_block: Dict, congestion: float):
+    def simulate_ethereum_pos_block(self, block_num: int, proposer_id: str, ethereum_block: Dict,
+                                    congestion: float) -> PoSBlockResult:
         """Simulate standard Ethereum PoS block using real Ethereum data"""
-        start_time = time.time()
-        
-        # Convert Ethereum transactions
-        transactions = [self.convert_ethereum_tx(tx) for tx in ethereum_block.get('transactions', [])]
+        # Per-transaction fields as arrays (built once per block)
+        gas_prices, gas_limits, values = self.block_tx_arrays(ethereum_block)
+        tx_count = len(values)
         
         # Mempool processing
-        mempool_time = random.uniform(0.01, 0.05) * len(transactions) / 100
-        time.sleep(min(mempool_time, 0.05))
+        mempool_time = self.rng.uniform(0.01, 0.05) * tx_count / 100
         
         # Block proposal (validator can see all transaction details and reorder)
-        proposal_time = self.simulate_network_delay(congestion) + random.uniform(0.05, 0.15)
-        time.sleep(min(proposal_time, 0.2))
+        proposal_time = self.simulate_network_delay(congestion) + self.rng.uniform(0.05, 0.15)
         
         # Confirmation
         confirmation_time = self.simulate_network_delay(congestion)
-        time.sleep(min(confirmation_time, 0.1))
-        
-        total_time = time.time() - start_time
         
-        # Calculate costs (using real gas prices from transactions)
-        gas_cost = sum(tx.get('gas_price', 20) * tx.get('gas_limit', 21000) * self.gas_cost_per_unit 
-                      for tx in transactions)
+        # As in simulate_p2s_block, the block time is the sum of the sampled phases
+        total_time = mempool_time + proposal_time + confirmation_time
         
-        # Block reward
-        block_reward = 2.0 + sum(tx.get('gas_price', 20) * tx.get('gas_limit', 21000) * self.gas_cost_per_unit * 0.1 
-                                for tx in transactions)
+        gas_cost, block_reward, mev_opportunity = self.block_economics(gas_prices, gas_limits, values)
         
         # MEV reordering opportunity (full visibility - can see all transaction details)
-        mev_opportunity = self.calculate_reordering_opportunity(transactions) * 1.0  # 100% of potential
+        mev_opportunity *= 1.0  # 100% of potential
         
         # Update validator metrics
         if proposer_id in self.validators:
@@ -237,34 +330,33 @@ class P2SSimulator:
                                                           self.validators[proposer_id]['total_gas_costs'])
             self.validators[proposer_id]['mev_extracted'] += mev_opportunity * 0.6  # Assume 60% extraction rate
         
-        return {
-            'block_number': ethereum_block.get('block_number', block_num),
-            'proposer': proposer_id,
-            'protocol': 'Ethereum PoS',
-            'transaction_count': len(transactions),
-            'total_time': total_time,
-            'mempool_time': mempool_time,
-            'proposal_time': proposal_time,
-            'confirmation_time': confirmation_time,
-            'gas_cost': gas_cost,
-            'block_reward': block_reward,
-            'mev_opportunity': mev_opportunity,
-            'network_latency': proposal_time + confirmation_time,
-            'congestion_level': congestion
-        }
+        return PoSBlockResult(
+            block_number=ethereum_block.get('block_number', block_num),
+            proposer=proposer_id,
+            protocol='Ethereum PoS',
+            transaction_count=tx_count,
+            total_time=total_time,
+            mempool_time=mempool_time,
+            proposal_time=proposal_time,
+            confirmation_time=confirmation_time,
+            gas_cost=gas_cost,
+            block_reward=block_reward,
+            mev_opportunity=mev_opportunity,
+            network_latency=proposal_time + confirmation_time,
+            congestion_level=congestion
+        )
     
     def calculate_gini_coefficient(self, values: List[float]) -> float:
         """Calculate Gini coefficient for profit distribution"""
-        if not values or all(v == 0 for v in values):
+        sorted_values = np.sort(np.asarray(values, dtype=np.float64))
+        if not sorted_values.size or not sorted_values.any():
             return 0.0
         
-        sorted_values = sorted(values)
-        n = len(sorted_values)
-        cumsum = 0
-        for i, value in enumerate(sorted_values, 1):
-            cumsum += value * (2 * i - n - 1)
+        n = sorted_values.size
+        cumsum = np.dot(sorted_values, 2 * np.arange(1, n + 1) - n - 1)
+        total = sorted_values.sum()
         
-        return cumsum / (n * sum(sorted_values)) if sum(sorted_values) > 0 else 0.0
+        return float(cumsum / (n * total)) if total > 0 else 0.0
     
     def run_simulation(self, num_blocks: int = 1000):
         """Run comprehensive simulation using real Ethereum block data"""
@@ -276,27 +368,27 @@ class P2SSimulator:
         print("=" * 80)
         
         # Load real Ethereum blocks
-        ethereum_blocks = self.load_ethereum_blocks()
+        # Use first N blocks
+        ethereum_blocks = self.load_ethereum_blocks(num_blocks=num_blocks)
         if not ethereum_blocks:
             print("❌ No Ethereum block data available. Please run extract_ethereum_blocks.py first.")
             return None
         
-        # Use first N blocks
-        ethereum_blocks = ethereum_blocks[:num_blocks]
-        
         # Create validators for each protocol
         num_validators = 10
         for i in range(num_validators):
-            stake = random.uniform(1000, 10000)
+            stake = self.rng.uniform(1000, 10000)
             self.create_validator(f"p2s_validator_{i}", stake, "P2S")
             self.create_validator(f"ethereum_pos_validator_{i}", stake, "Ethereum PoS")
         
         # Run simulations
         congestion_levels = [0.0, 0.1, 0.3, 0.5, 0.7]
+        self.allocate_block_metrics(len(ethereum_blocks))
         
-        for i, ethereum_block in enumerate(ethereum_blocks):
-            congestion = random.choice(congestion_levels)
-            
+        # One congestion level per block, drawn in a single batch
+        congestions = self.rng.choice(congestion_levels, size=len(ethereum_blocks)).tolist()
+        
+        for i, (ethereum_block, congestion) in enumerate(zip(ethereum_blocks, congestions)):
             # Select proposers (weighted by stake)
             p2s_proposer = self.select_proposer("P2S")
             ethereum_pos_proposer = self.select_proposer("Ethereum PoS")
@@ -307,6 +399,8 @@ class P2SSimulator:
             
             self.results['p2s_data'].append(p2s_block)
             self.results['ethereum_pos_data'].append(ethereum_pos_block)
+            self.record_block_metrics('p2s', i, p2s_block)
+            self.record_block_metrics('ethereum_pos', i, ethereum_pos_block)
             
             if (i + 1) % 100 == 0 or (i + 1) == len(ethereum_blocks):
                 print(f"Processed {i + 1}/{len(ethereum_blocks)} blocks...")
@@ -324,20 +418,23 @@ class P2SSimulator:
     
     def select_proposer(self, protocol: str) -> str:
         """Select proposer weighted by stake"""
-        protocol_validators = [(v_id, v) for v_id, v in self.validators.items() 
-                              if v['protocol'] == protocol]
-        if not protocol_validators:
+        table = self._proposer_tables.get(protocol)
+        if table is None:
+            # Built once per protocol (create_validator invalidates it)
+            protocol_validators = [(v_id, v) for v_id, v in self.validators.items()
+                                   if v['protocol'] == protocol]
+            table = self._proposer_tables[protocol] = (
+                [v_id for v_id, _ in protocol_validators],
+                np.cumsum([v['stake'] for _, v in protocol_validators], dtype=np.float64),
+            )
+        validator_ids, cumulative_stake = table
+        if not validator_ids:
             return list(self.validators.keys())[0]
         
-        # Weighted random selection
-        total_stake = sum(v['stake'] for _, v in protocol_validators)
-        r = random.uniform(0, total_stake)
-        cumsum = 0
-        for v_id, v in protocol_validators:
-            cumsum += v['stake']
-            if r <= cumsum:
-                return v_id
-        return protocol_validators[-1][0]
+        # Weighted random selection: first validator whose cumulative stake reaches r
+        r = self.rng.uniform(0, cumulative_stake[-1])
+        index = int(np.searchsorted(cumulative_stake, r, side='left'))
+        return validator_ids[min(index, len(validator_ids) - 1)]
     
     def print_summary(self):
         """Print simulation summary"""
@@ -364,50 +461,78 @@ class P2SSimulator:
             mean_cost = self.results['overhead_metrics'][protocol_key]['mean_cost']
             print(f"  {protocol_label}: {mean_latency:.3f}s latency, ${mean_cost:.4f} cost per block")
     
+    def allocate_block_metrics(self, num_blocks: int):
+        """Preallocate the per-protocol block metric columns for num_blocks blocks"""
+        self.block_metrics = {
+            protocol_key: {col: np.empty(num_blocks, dtype=np.float64) for col in self.BLOCK_METRIC_COLUMNS}
+            for protocol_key in ('p2s', 'ethereum_pos')
+        }
+    
+    def record_block_metrics(self, protocol_key: str, index: int, block):
+        """Write one simulated block's metrics into row index of the protocol's columns"""
+        columns = self.block_metrics[protocol_key]
+        for col in self.BLOCK_METRIC_COLUMNS:
+            columns[col][index] = getattr(block, col)
+    
+    def block_metric_columns(self, protocol_key: str) -> Dict[str, np.ndarray]:
+        """Per-block metric columns of a protocol, rebuilt from results if they were not recorded"""
+        blocks = self.results[f'{protocol_key}_data']
+        columns = self.block_metrics.get(protocol_key)
+        if columns is None or len(columns['total_time']) != len(blocks):
+            columns = {col: np.fromiter((getattr(block, col) for block in blocks), dtype=np.float64, count=len(blocks))
+                       for col in self.BLOCK_METRIC_COLUMNS}
+        return columns
+    
     def calculate_metrics(self):
         """Calculate aggregate research metrics"""
         # Profit distribution metrics
         for protocol in ['P2S', 'Ethereum PoS']:
             protocol_key = protocol.lower().replace(' ', '_')
             protocol_validators = [v for v in self.validators.values() if v['protocol'] == protocol]
-            profits = [v['net_profit'] for v in protocol_validators]
+            profits = np.fromiter((v['net_profit'] for v in protocol_validators),
+                                  dtype=np.float64, count=len(protocol_validators))
             
             self.results['profit_distribution'][protocol_key] = {
-                'profits': profits,
+                'profits': profits.tolist(),
                 'gini_coefficient': self.calculate_gini_coefficient(profits),
-                'mean_profit': statistics.mean(profits) if profits else 0,
-                'std_profit': statistics.stdev(profits) if len(profits) > 1 else 0,
-                'min_profit': min(profits) if profits else 0,
-                'max_profit': max(profits) if profits else 0,
+                'mean_profit': float(profits.mean()) if profits.size else 0,
+                'std_profit': float(profits.std(ddof=1)) if profits.size > 1 else 0,
+                'min_profit': float(profits.min()) if profits.size else 0,
+                'max_profit': float(profits.max()) if profits.size else 0,
                 'total_rewards': sum(v['total_rewards'] for v in protocol_validators),
                 'total_costs': sum(v['total_gas_costs'] for v in protocol_validators)
             }
         
         # MEV reordering metrics
-        for protocol_data, protocol_name in [(self.results['p2s_data'], 'p2s'),
-                                            (self.results['ethereum_pos_data'], 'ethereum_pos')]:
-            mev_opportunities = [block['mev_opportunity'] for block in protocol_data]
+        for protocol_name in ['p2s', 'ethereum_pos']:
+            mev_opportunities = self.block_metric_columns(protocol_name)['mev_opportunity']
             self.results['mev_reordering'][protocol_name] = {
-                'opportunities': mev_opportunities,
-                'mean_mev': statistics.mean(mev_opportunities) if mev_opportunities else 0,
-                'total_mev': sum(mev_opportunities),
-                'blocks_with_mev': sum(1 for mev in mev_opportunities if mev > 0)
+                'opportunities': mev_opportunities.tolist(),
+                'mean_mev': float(mev_opportunities.mean()) if mev_opportunities.size else 0,
+                'total_mev': float(mev_opportunities.sum()),
+                'blocks_with_mev': int(np.count_nonzero(mev_opportunities > 0))
             }
         
         # Overhead metrics
-        for protocol_data, protocol_name in [(self.results['p2s_data'], 'p2s'),
-                                            (self.results['ethereum_pos_data'], 'ethereum_pos')]:
-            latencies = [block['network_latency'] for block in protocol_data]
-            costs = [block['gas_cost'] for block in protocol_data]
-            times = [block['total_time'] for block in protocol_data]
+        for protocol_name in ['p2s', 'ethereum_pos']:
+            columns = self.block_metric_columns(protocol_name)
+            latencies = columns['network_latency']
+            costs = columns['gas_cost']
+            times = columns['total_time']
+            
+            # p95/p99 are the order statistics at int(n * q), selected without a full sort
+            n = latencies.size
+            p95_index, p99_index = int(n * 0.95), int(n * 0.99)
+            if n:
+                selected = np.partition(latencies, (p95_index, p99_index))
             
             self.results['overhead_metrics'][protocol_name] = {
-                'mean_latency': statistics.mean(latencies) if latencies else 0,
-                'mean_cost': statistics.mean(costs) if costs else 0,
-                'mean_time': statistics.mean(times) if times else 0,
-                'total_cost': sum(costs),
-                'p95_latency': sorted(latencies)[int(len(latencies) * 0.95)] if latencies else 0,
-                'p99_latency': sorted(latencies)[int(len(latencies) * 0.99)] if latencies else 0
+                'mean_latency': float(latencies.mean()) if n else 0,
+                'mean_cost': float(costs.mean()) if n else 0,
+                'mean_time': float(times.mean()) if n else 0,
+                'total_cost': float(costs.sum()),
+                'p95_latency': float(selected[p95_index]) if n else 0,
+                'p99_latency': float(selected[p99_index]) if n else 0
             }
     
     def save_results(self):
@@ -415,11 +540,16 @@ class P2SSimulator:
         os.makedirs('data', exist_ok=True)
         filename = f"data/simulation_{self.results['metadata']['timestamp']}.json"
         
-        # Convert to JSON-serializable format
-        json_results = json.loads(json.dumps(self.results, default=str))
-        
-        with open(filename, 'w') as f:
-            json.dump(json_results, f, indent=2)
+        # Encode compactly in one pass; block records are dataclasses (orjson encodes them natively),
+        # and default=str covers anything else not JSON-serializable
+        if orjson is not None:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(self.results, default=str,
+                                     option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(filename, 'w') as f:
+                json.dump(self.results, f, separators=(',', ':'),
+                          default=lambda o: asdict(o) if is_dataclass(o) else str(o))
         
         print(f"\n💾 Results saved to {filename}")
 
@@ -435,7 +565,15 @@ def main():
             print("Error: Number of blocks must be an integer")
             sys.exit(1)
     
-    simulator = P2SSimulator()
+    seed = None
+    if len(sys.argv) > 2:
+        try:
+            seed = int(sys.argv[2])
+        except ValueError:
+            print("Error: Seed must be an integer")
+            sys.exit(1)
+    
+    simulator = P2SSimulator(seed)
     results = simulator.run_simulation(num_blocks)
     
     print(f"\n✅ Simulation complete!")
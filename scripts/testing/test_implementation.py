@@ -4,181 +4,372 @@ Implementation Test Script
 Tests the consensus implementation without requiring full Ethereum setup
 """
 
+import functools
+import hashlib
+import json
+import shlex
+import shutil
+import stat
 import subprocess
 import sys
 import os
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-def run_command(command, description):
-    """Run a command and return the result"""
-    print(f"[TEST] {description}")
-    print(f"   Command: {command}")
+# Executables resolved once; every command is a direct exec with no PATH search
+GO = shutil.which("go") or "go"
+DEPLOY_SCRIPT = os.path.abspath("scripts/deploy_testnet.sh")
+
+# Seconds before a command is killed, and how much of its output the summary keeps
+COMMAND_TIMEOUT = 600
+OUTPUT_TAIL_LINES = 200
+
+# Set P2S_TEST_VERBOSE=1 to echo command output as it is produced
+VERBOSE = bool(os.environ.get('P2S_TEST_VERBOSE'))
+
+# Go's build cache: an explicit GOCACHE wins, otherwise it lives in .gocache
+# under the working tree so CI can save and restore it between runs
+COMMAND_ENV = dict(os.environ, GOCACHE=os.environ.get('GOCACHE') or os.path.abspath('.gocache'))
+
+# The repository Makefile runs the same checks without Python; the paths and Go
+# packages both runners check are defined once, as variables there
+MAKEFILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "Makefile")
+
+def _makefile_vars(path):
+    """Top-level `NAME := words` assignments of a Makefile, as {NAME: [words]}"""
+    with open(path, 'r') as f:
+        text = f.read().replace('\\\n', ' ')
+    variables = {}
+    for line in text.splitlines():
+        name, sep, value = line.partition(':=')
+        if sep and not line[:1].isspace() and name.strip().isidentifier():
+            variables[name.strip()] = value.split()
+    return variables
+
+_make_vars = _makefile_vars(MAKEFILE)
+REQUIRED_DIRS = _make_vars["REQUIRED_DIRS"]
+REQUIRED_DOCS = _make_vars["REQUIRED_DOCS"]
+GO_MODULE = _make_vars["GO_MODULE"][0]
+BUILD_PKGS = _make_vars["BUILD_PKGS"]
+TEST_PKGS = _make_vars["TEST_PKGS"]
+
+# Source fingerprint of the last successful build, used to skip unchanged rebuilds
+BUILD_STAMP_PATH = '.p2s_test_cache.json'
+BUILD_ROOTS = tuple(pkg.removeprefix("./").removesuffix("/...") for pkg in BUILD_PKGS)
+BUILD_ENV_VARS = ("GOROOT", "GOPATH", "GOFLAGS", "GOOS", "GOARCH", "GOAMD64",
+                  "GOEXPERIMENT", "CGO_ENABLED", "CC", "CGO_CFLAGS", "CGO_LDFLAGS")
+
+# `go env` values probed by the Go Installation stage, for the stages that depend on it
+_go_env = {}
+
+_output_lock = threading.Lock()
+
+# The tree does not change while the suite runs, so path probes shared
+# between stages are answered once
+@functools.lru_cache(maxsize=512)
+def _stat(path):
+    """os.stat(path), or None if it does not exist"""
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+def _exists(path):
+    return _stat(path) is not None
+
+def _is_regular_file(path):
+    st = _stat(path)
+    return st is not None and stat.S_ISREG(st.st_mode)
+
+@functools.lru_cache(maxsize=64)
+def _dir_entries(parent):
+    """Entries of one directory by name, read with a single scandir pass (empty if it is missing)"""
+    try:
+        with os.scandir(parent) as it:
+            return {entry.name: entry for entry in it}
+    except (FileNotFoundError, NotADirectoryError):
+        return {}
+
+def _listed_dir(path):
+    """True if path is listed as a directory, using the d_type from readdir (no extra stat)"""
+    parent, name = os.path.split(path)
+    entry = _dir_entries(parent or ".").get(name)
+    return entry is not None and entry.is_dir(follow_symlinks=False)
+
+def _go_sources_stamp(roots, goversion):
+    """Digest of everything the build depends on, or None when GOVERSION is unknown
+
+    Covers the toolchain (GOVERSION, go binary, BUILD_ENV_VARS) and the sorted
+    (path, mtime_ns) list of every file under roots plus go.mod/go.sum, so an
+    upgrade, a flag change, or an added, removed, renamed or touched file all change it.
+    """
+    if not goversion:
+        return None
+    files = []
+    pending = list(roots)
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    else:
+                        files.append((entry.path, entry.stat().st_mtime_ns))
+        except FileNotFoundError:
+            continue
+    for name in ("go.mod", "go.sum"):
+        try:
+            files.append((name, os.stat(name).st_mtime_ns))
+        except FileNotFoundError:
+            pass
+    files.sort()
+    toolchain = [goversion, GO] + [os.environ.get(name, '') for name in BUILD_ENV_VARS]
+    return hashlib.sha256(json.dumps([toolchain, files]).encode()).hexdigest()
+
+def _load_build_stamp():
+    try:
+        with open(BUILD_STAMP_PATH, 'r') as f:
+            return json.load(f).get('sources')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def _save_build_stamp(stamp):
+    try:
+        with open(BUILD_STAMP_PATH, 'w') as f:
+            json.dump({'sources': stamp}, f)
+    except OSError:
+        pass
+
+def write_log(log):
+    """Write a stage's log lines to stdout in one locked write"""
+    with _output_lock:
+        sys.stdout.write("\n".join(log) + "\n")
+        sys.stdout.flush()
+
+def run_command(argv, description, log, verbose=VERBOSE, outputs=None):
+    """Run a command, given as an argv list (no shell), and return the result
+
+    Summary lines are appended to log. Output is read as raw bytes as it is
+    produced; only the last OUTPUT_TAIL_LINES lines are decoded, for the
+    summary, and with verbose every line is also decoded and echoed live.
+    If outputs is a list, the summarized output of a successful run is appended to it.
+    """
+    log.append(f"[TEST] {description}")
+    log.append(f"   Command: {shlex.join(argv)}")
     
     try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
-        if result.returncode == 0:
-            print(f"   [SUCCESS] Success")
-            if result.stdout:
-                print(f"   Output: {result.stdout.strip()}")
-            return True
-        else:
-            print(f"   [FAILED] Failed")
-            if result.stderr:
-                print(f"   Error: {result.stderr.strip()}")
-            return False
+        proc = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                env=COMMAND_ENV)
     except Exception as e:
-        print(f"   [ERROR] Exception: {e}")
+        log.append(f"   [ERROR] Exception: {e}")
+        return False
+    
+    tail = deque(maxlen=OUTPUT_TAIL_LINES)
+    
+    def pump():
+        for line in proc.stdout:
+            tail.append(line)
+            if verbose:
+                text = line.decode("utf-8", errors="replace")
+                with _output_lock:
+                    sys.stdout.write(text)
+    
+    reader = threading.Thread(target=pump, daemon=True)
+    reader.start()
+    try:
+        returncode = proc.wait(timeout=COMMAND_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        reader.join()
+        log.append(f"   [ERROR] Timed out after {COMMAND_TIMEOUT}s")
+        return False
+    reader.join()
+    proc.stdout.close()
+    
+    output = b"".join(tail).decode("utf-8", errors="replace").strip()
+    if returncode == 0:
+        log.append(f"   [SUCCESS] Success")
+        if output:
+            log.append(f"   Output: {output}")
+        if outputs is not None:
+            outputs.append(output)
+        return True
+    else:
+        log.append(f"   [FAILED] Failed")
+        if output:
+            log.append(f"   Error: {output}")
         return False
 
-def test_go_installation():
+def test_go_installation(log):
     """Test if Go is installed and working"""
-    print("\n[TEST] Testing Go Installation")
-    print("=" * 40)
+    log.append("\n[TEST] Testing Go Installation")
+    log.append("=" * 40)
     
-    # Check Go version
-    if not run_command("go version", "Checking Go version"):
+    # Check the Go version and environment with a single go startup
+    outputs = []
+    if not run_command([GO, "env", "-json", "GOVERSION", "GOPATH"], "Probing Go toolchain", log, outputs=outputs):
         return False
     
-    # Check Go environment
-    if not run_command("go env GOPATH", "Checking Go environment"):
+    try:
+        env = json.loads(outputs[0])
+        version, gopath = env['GOVERSION'], env['GOPATH']
+    except (ValueError, KeyError, TypeError):
+        log.append("[FAILED] Unexpected go env output")
+        return False
+    if not version or not gopath:
+        log.append("[FAILED] GOVERSION or GOPATH is not set")
         return False
     
+    _go_env.update(env)
     return True
 
-def test_implementation():
+def test_implementation(log):
     """Test P2S implementation"""
-    print("\n[TEST] Testing P2S Implementation")
-    print("=" * 40)
+    log.append("\n[TEST] Testing P2S Implementation")
+    log.append("=" * 40)
     
     # Check if we're in the right directory
-    if not os.path.exists("consensus/p2s"):
-        print("[FAILED] P2S consensus directory not found")
+    if not _exists("consensus/p2s"):
+        log.append("[FAILED] P2S consensus directory not found")
         return False
     
-    # Test Go modules
-    if not run_command("go mod init p2s-test", "Initializing Go module"):
-        return False
+    # Test Go modules (go mod init fails if a go.mod is already there, e.g. on a re-run)
+    if not os.path.exists("go.mod"):
+        if not run_command([GO, "mod", "init", GO_MODULE], "Initializing Go module", log):
+            return False
     
-    # Test compilation
-    if not run_command("go build ./consensus/p2s/...", "Building P2S consensus"):
-        return False
+    # Nothing to rebuild if no source changed since the last successful build
+    stamp = _go_sources_stamp(BUILD_ROOTS, _go_env.get('GOVERSION'))
+    if stamp is not None and stamp == _load_build_stamp():
+        log.append("[SKIP] build unchanged since last successful run")
+        return True
     
-    # Test core types
-    if not run_command("go build ./core/types/...", "Building core types"):
+    # Test compilation of the consensus engine and core types in one go invocation
+    if not run_command([GO, "build", *BUILD_PKGS], "Building P2S consensus and core types", log):
         return False
     
+    if stamp is not None:
+        _save_build_stamp(stamp)
     return True
 
-def test_tests():
+def test_tests(log):
     """Test P2S test suite"""
-    print("\n[TEST] Testing P2S Test Suite")
-    print("=" * 40)
+    log.append("\n[TEST] Testing P2S Test Suite")
+    log.append("=" * 40)
     
-    # Run tests
-    if not run_command("go test ./tests/consensus/ -v", "Running P2S tests"):
+    # Run tests, letting Go use every core for packages (-p) and parallel tests (-parallel);
+    # no -count=1, so unchanged packages are served from Go's test cache
+    n = str(os.cpu_count() or 4)
+    if not run_command([GO, "test", "-p", n, "-parallel", n, "-v", *TEST_PKGS], "Running P2S tests", log):
         return False
     
     return True
 
-def test_deployment_script():
+def test_deployment_script(log):
     """Test deployment script"""
-    print("\n[TEST] Testing Deployment Script")
-    print("=" * 40)
+    log.append("\n[TEST] Testing Deployment Script")
+    log.append("=" * 40)
     
-    # Check if deployment script exists
-    if not os.path.exists("scripts/deploy_testnet.sh"):
-        print("[FAILED] Deployment script not found")
+    # Check that the deployment script exists and is executable, from one stat
+    st = _stat("scripts/deploy_testnet.sh")
+    if st is None:
+        log.append("[FAILED] Deployment script not found")
         return False
     
-    # Check if script is executable
-    if not os.access("scripts/deploy_testnet.sh", os.X_OK):
-        print("[FAILED] Deployment script is not executable")
+    if not st.st_mode & stat.S_IXUSR:
+        log.append("[FAILED] Deployment script is not executable")
         return False
     
     # Test script help
-    if not run_command("./scripts/deploy_testnet.sh help", "Testing deployment script help"):
+    if not run_command([DEPLOY_SCRIPT, "help"], "Testing deployment script help", log):
         return False
     
     return True
 
-def test_directory_structure():
+def test_directory_structure(log):
     """Test directory structure"""
-    print("\n[TEST] Testing Directory Structure")
-    print("=" * 40)
-    
-    required_dirs = [
-        "consensus/p2s",
-        "core/types",
-        "crypto/commitment",
-        "crypto/signatures",
-        "network/p2p",
-        "network/rpc",
-        "miner",
-        "tests/consensus",
-        "tests/integration",
-        "tests/e2e",
-        "scripts/testing",
-        "scripts/monitoring",
-        "config/testnet",
-        "config/mainnet",
-        "docs"
-    ]
+    log.append("\n[TEST] Testing Directory Structure")
+    log.append("=" * 40)
     
     all_exist = True
-    for dir_path in required_dirs:
-        if os.path.exists(dir_path):
-            print(f"   [SUCCESS] {dir_path}")
+    for dir_path in REQUIRED_DIRS:
+        if _listed_dir(dir_path):
+            log.append(f"   [SUCCESS] {dir_path}")
         else:
-            print(f"   [FAILED] {dir_path}")
+            log.append(f"   [FAILED] {dir_path}")
             all_exist = False
     
     return all_exist
 
-def test_documentation():
+def test_documentation(log):
     """Test documentation"""
-    print("\n[TEST] Testing Documentation")
-    print("=" * 40)
-    
-    required_docs = [
-        "README.md",
-        "docs/P2S_PROTOCOL_SPEC.md",
-        "docs/CONSENSUS_DESIGN.md"
-    ]
+    log.append("\n[TEST] Testing Documentation")
+    log.append("=" * 40)
     
     all_exist = True
-    for doc_path in required_docs:
-        if os.path.exists(doc_path):
-            print(f"   [SUCCESS] {doc_path}")
+    for doc_path in REQUIRED_DOCS:
+        if _is_regular_file(doc_path):
+            log.append(f"   [SUCCESS] {doc_path}")
         else:
-            print(f"   [FAILED] {doc_path}")
+            log.append(f"   [FAILED] {doc_path}")
             all_exist = False
     
     return all_exist
 
+def run_stage(test_name, test_func, prerequisites=()):
+    """Run one stage after its prerequisites, collecting its log lines; returns (passed, log)
+
+    prerequisites are (name, future) pairs; if any of them failed the stage is skipped.
+    """
+    log = [f"\n{'='*20} {test_name} {'='*20}"]
+    failed = [name for name, future in prerequisites if not future.result()[0]]
+    if failed:
+        log.append(f"[SKIPPED] {test_name} (requires {', '.join(failed)})")
+        return False, log
+    ok = test_func(log)
+    if ok:
+        log.append(f"[SUCCESS] {test_name} PASSED")
+    else:
+        log.append(f"[FAILED] {test_name} FAILED")
+    return ok, log
+
 def main():
     """Main test function"""
     print("[START] Implementation Test Suite")
     print("=" * 50)
     
-    tests = [
-        ("Go Installation", test_go_installation),
-        ("Directory Structure", test_directory_structure),
-        ("Documentation", test_documentation),
-        ("Implementation", test_implementation),
-        ("Tests", test_tests),
-        ("Deployment Script", test_deployment_script),
+    _stat.cache_clear()
+    _dir_entries.cache_clear()
+    
+    # (name, stage, prerequisite stage names); listed so that prerequisites come first
+    stages = [
+        ("Go Installation", test_go_installation, ()),
+        ("Directory Structure", test_directory_structure, ()),
+        ("Documentation", test_documentation, ()),
+        ("Deployment Script", test_deployment_script, ("Directory Structure",)),
+        ("Implementation", test_implementation, ("Go Installation",)),
+        ("Tests", test_tests, ("Implementation",)),
     ]
     
     passed = 0
-    total = len(tests)
+    total = len(stages)
     
-    for test_name, test_func in tests:
-        print(f"\n{'='*20} {test_name} {'='*20}")
-        if test_func():
-            passed += 1
-            print(f"[SUCCESS] {test_name} PASSED")
-        else:
-            print(f"[FAILED] {test_name} FAILED")
+    # Stages run concurrently as soon as their prerequisites pass. The pool takes
+    # jobs in submission order, so a stage only ever waits on stages already running.
+    workers = max(1, min(len(stages), (os.cpu_count() or 1) - 2))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for test_name, test_func, requires in stages:
+            prerequisites = [(name, futures[name]) for name in requires]
+            futures[test_name] = executor.submit(run_stage, test_name, test_func, prerequisites)
+        # Each stage's log is written in one piece, in list order
+        for future in futures.values():
+            ok, log = future.result()
+            write_log(log)
+            passed += ok
     
     print(f"\n{'='*50}")
     print(f"[STATS] Test Results: {passed}/{total} tests passed")
@@ -310,6 +310,8 @@ class P2SSimulator:
     def create_plots(self):
         """Create block time distribution plots"""
         try:
+            import matplotlib
+            matplotlib.use('Agg', force=True)  # headless: only files are written
             import matplotlib.pyplot as plt
             import numpy as np
         except ImportError:
@@ -427,6 +429,7 @@ class P2SSimulator:
         os.makedirs('plots', exist_ok=True)
         plt.savefig(f'plots/block_time_distribution_{timestamp}.png', 
                    dpi=300, bbox_inches='tight')
+        plt.close(fig)
         
         print(f"\n[PLOTS] Block time distribution charts saved to figures/ and plots/ directories")
         